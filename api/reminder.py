@@ -1,25 +1,57 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-from aiogram import Bot
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 
 from bot.app import setup_logging
-from bot.config import load_settings
+from bot.config import get_settings
 from bot.db import Database
-from bot.services.reminder_service import ReminderService
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from bot.services.reminder_service import ReminderService
 
 setup_logging()
 
 app = FastAPI(title="SchoolScheduleBot Reminder Tick")
 
-settings = load_settings()
-db = Database()
-bot = Bot(token=settings.bot_token)
-service = ReminderService(bot=bot, db=db, timezone=settings.timezone)
 CRON_SECRET = os.getenv("CRON_SECRET", "").strip()
+# With REMINDER_SHARDS > 1 the cron call fans out to that many shard invocations
+REMINDER_SHARDS = max(1, int(os.getenv("REMINDER_SHARDS", "1")))
+# Max reminders a single shard invocation sends; the rest wait for the next tick
+REMINDER_SHARD_BUDGET = int(os.getenv("REMINDER_SHARD_BUDGET", "0")) or None
+SHARD_TIMEOUT_SECONDS = float(os.getenv("REMINDER_SHARD_TIMEOUT", "55"))
+
+db = Database()
+# Ticks answered by the next_due_at pre-check, without building the service
+precheck_skipped = 0
+
+
+@lru_cache(maxsize=1)
+def get_service() -> ReminderService:
+    """Build the bot and the reminder service on the first tick that has work to do.
+
+    Importing aiogram dominates cold-start time, and most ticks find nothing due.
+    """
+    from aiogram import Bot
+
+    from bot.services.reminder_service import SEND_RATE_PER_SECOND, ReminderService
+
+    settings = get_settings()
+    # Shards run in parallel, so each gets its part of Telegram's global rate limit
+    return ReminderService(
+        bot=Bot(token=settings.bot_token),
+        db=db,
+        timezone=settings.timezone,
+        send_rate_per_second=SEND_RATE_PER_SECOND / REMINDER_SHARDS,
+    )
 
 
 @app.on_event("startup")
@@ -29,19 +61,108 @@ async def startup() -> None:
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    await bot.session.close()
+    if get_service.cache_info().currsize:
+        await get_service().bot.session.close()
+    await db.close()
+
+
+def _counters() -> dict[str, int]:
+    service = get_service() if get_service.cache_info().currsize else None
+    return {
+        "ticks_skipped": precheck_skipped + (service.ticks_skipped if service else 0),
+        "ticks_total": precheck_skipped + (service.ticks_total if service else 0),
+    }
+
+
+async def _nothing_due() -> bool:
+    """Cheap next_due_at check that does not need the bot or the reminder service."""
+    global precheck_skipped
+    next_due_at = await db.get_reminder_next_due_at()
+    if next_due_at is not None and time.time() < next_due_at:
+        precheck_skipped += 1
+        return True
+    return False
+
+
+def _tick_result(report, skipped: bool) -> dict[str, Any]:
+    return {
+        "status": "ok",
+        "skipped": skipped,
+        "sent": report.sent if report else 0,
+        "failed": report.failed if report else 0,
+        **_counters(),
+    }
+
+
+async def _call_shard(
+    session: aiohttp.ClientSession,
+    request: Request,
+    shard: int,
+    authorization: str | None,
+) -> dict[str, Any]:
+    url = str(request.url.include_query_params(shard=shard, shards=REMINDER_SHARDS))
+    headers = {"Authorization": authorization} if authorization else {}
+    try:
+        async with session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json()
+    except Exception as exc:
+        logging.exception("Reminder shard %s/%s failed: %s", shard, REMINDER_SHARDS, exc)
+        return {"status": "error", "shard": shard}
+
+
+async def _fan_out(request: Request, authorization: str | None) -> dict[str, Any]:
+    import aiohttp
+
+    service = get_service()
+    if not await service.prepare_tick():
+        return _tick_result(None, skipped=True)
+
+    timeout = aiohttp.ClientTimeout(total=SHARD_TIMEOUT_SECONDS)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(_call_shard(session, request, shard, authorization) for shard in range(REMINDER_SHARDS))
+        )
+    await service.update_next_due_at()
+    return {
+        "status": "ok",
+        "skipped": False,
+        "shards": REMINDER_SHARDS,
+        "sent": sum(int(result.get("sent", 0)) for result in results),
+        "failed": sum(int(result.get("failed", 0)) for result in results),
+        "shard_errors": sum(1 for result in results if result.get("status") != "ok"),
+        **_counters(),
+    }
 
 
 @app.get("/")
-async def run_reminder_tick(authorization: str | None = Header(default=None)) -> dict[str, str]:
+async def run_reminder_tick(
+    request: Request,
+    shard: int | None = None,
+    shards: int = 1,
+    authorization: str | None = Header(default=None),
+) -> dict[str, Any]:
     if CRON_SECRET:
         expected = f"Bearer {CRON_SECRET}"
         if authorization != expected:
             raise HTTPException(status_code=403, detail="Forbidden")
+    if shard is not None and not 0 <= shard < shards:
+        raise HTTPException(status_code=400, detail="shard must be in [0, shards)")
 
     try:
-        await service.check_once()
-        return {"status": "ok"}
+        if await _nothing_due():
+            return _tick_result(None, skipped=True)
+        if shard is None and REMINDER_SHARDS > 1:
+            return await _fan_out(request, authorization)
+
+        service = get_service()
+        skipped_before = service.ticks_skipped
+        report = await service.tick(
+            shard=shard or 0,
+            shards=shards if shard is not None else 1,
+            budget=REMINDER_SHARD_BUDGET if shard is not None else None,
+        )
+        return _tick_result(report, skipped=service.ticks_skipped > skipped_before)
     except Exception as exc:  # pragma: no cover
         logging.exception("Reminder tick failed: %s", exc)
         raise HTTPException(status_code=500, detail="Reminder tick failed") from exc
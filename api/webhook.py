@@ -2,38 +2,110 @@ from __future__ import annotations
 
 import logging
 import os
+from functools import lru_cache
+from typing import Any
 
-from aiogram import Bot
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
 from aiogram.types import Update
 from fastapi import FastAPI, Header, HTTPException, Request
 
 from bot.app import create_dispatcher, setup_logging
-from bot.config import load_settings
+from bot.config import get_settings
 from bot.db import Database
 from bot.services.schedule_service import ScheduleService
+from bot.update_queue import UPDATE_QUEUE_SIZE, UPDATE_WORKERS, UpdateQueue
+from bot.utils import json_loads
 
 setup_logging()
 
 app = FastAPI(title="SchoolScheduleBot Webhook")
 
-settings = load_settings()
 db = Database()
-bot = Bot(token=settings.bot_token)
-dp = create_dispatcher()
 schedule_service = ScheduleService(db)
 
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "").strip()
+# Answer Telegram right away and process updates on a background worker pool.
+# Only for long-lived hosts: a serverless function may be frozen after it responds.
+WEBHOOK_BACKGROUND = os.getenv("WEBHOOK_BACKGROUND", "").strip().lower() in {"1", "true", "yes"}
+# Answer simple commands inside the webhook HTTP response instead of a separate sendMessage call
+WEBHOOK_REPLY_IN_RESPONSE = os.getenv("WEBHOOK_REPLY_IN_RESPONSE", "1").strip().lower() in {"1", "true", "yes"}
+# What to do when the queue is full: "inline" processes the update in the request, "reject" answers 429
+WEBHOOK_OVERFLOW = os.getenv("WEBHOOK_OVERFLOW", "inline").strip().lower()
+
+
+# The bot and the dispatcher (every handler module) are built on first use, not at import
+@lru_cache(maxsize=1)
+def get_bot() -> Bot:
+    return Bot(token=get_settings().bot_token)
+
+
+@lru_cache(maxsize=1)
+def get_dispatcher() -> Dispatcher:
+    return create_dispatcher(db)
+
+
+@lru_cache(maxsize=1)
+def used_update_types() -> frozenset[str]:
+    return frozenset(get_dispatcher().resolve_used_update_types())
+
+
+def webhook_reply(method: TelegramMethod[Any]) -> dict[str, Any] | None:
+    """JSON body that makes Telegram execute `method`, or None if it carries files."""
+    bot = get_bot()
+    files: dict[str, Any] = {}
+    payload: dict[str, Any] = {"method": method.__api_method__}
+    for key, value in method.model_dump(warnings=False).items():
+        prepared = bot.session.prepare_value(value, bot=bot, files=files, _dumps_json=False)
+        if prepared is not None:
+            payload[key] = prepared
+    return None if files else payload
+
+
+async def process_update(update: Update, reply_in_response: bool = False) -> dict[str, Any] | None:
+    bot = get_bot()
+    dp = get_dispatcher()
+    response = await dp.feed_update(
+        bot,
+        update,
+        settings=get_settings(),
+        db=db,
+        schedule_service=schedule_service,
+    )
+    if not isinstance(response, TelegramMethod):
+        return None
+    if reply_in_response:
+        reply = webhook_reply(response)
+        if reply is not None:
+            return reply
+    await dp.silent_call_request(bot, response)
+    return None
+
+
+update_queue = UpdateQueue(
+    process_update,
+    workers=int(os.getenv("WEBHOOK_WORKERS", str(UPDATE_WORKERS))),
+    maxsize=int(os.getenv("WEBHOOK_QUEUE_SIZE", str(UPDATE_QUEUE_SIZE))),
+)
 
 
 @app.on_event("startup")
 async def startup() -> None:
     await db.init()
-    logging.info("Webhook app started")
+    if WEBHOOK_BACKGROUND:
+        update_queue.start()
+    logging.info("Webhook app started (background=%s)", WEBHOOK_BACKGROUND)
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    await bot.session.close()
+    if WEBHOOK_BACKGROUND:
+        await update_queue.stop()
+    if get_dispatcher.cache_info().currsize:
+        await get_dispatcher().storage.close()
+    if get_bot.cache_info().currsize:
+        await get_bot().session.close()
+    await db.close()
 
 
 @app.get("/")
@@ -45,21 +117,33 @@ async def health() -> dict[str, str]:
 async def telegram_webhook(
     request: Request,
     x_telegram_bot_api_secret_token: str | None = Header(default=None),
-) -> dict[str, bool]:
+) -> dict[str, Any]:
     if WEBHOOK_SECRET and x_telegram_bot_api_secret_token != WEBHOOK_SECRET:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    data = await request.json()
-    update = Update.model_validate(data, context={"bot": bot})
-
-    await dp.feed_update(
-        bot,
-        update,
-        settings=settings,
-        db=db,
-        schedule_service=schedule_service,
-    )
-    return {"ok": True}
+    try:
+        data = json_loads(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid JSON") from exc
+    # Ignore update types no router handles before paying for pydantic validation
+    if not isinstance(data, dict) or used_update_types().isdisjoint(data):
+        return {"ok": True}
+    update = Update.model_validate(data, context={"bot": get_bot()})
+
+    if WEBHOOK_BACKGROUND and update_queue.submit(update):
+        return {"ok": True}
+    if WEBHOOK_BACKGROUND:
+        logging.warning("Update queue full (depth=%s), overflow=%s", update_queue.depth, WEBHOOK_OVERFLOW)
+        if WEBHOOK_OVERFLOW == "reject":
+            raise HTTPException(status_code=429, detail="Too many updates")
+
+    try:
+        reply = await process_update(update, reply_in_response=WEBHOOK_REPLY_IN_RESPONSE)
+    finally:
+        # A serverless instance may be frozen right after it responds, so FSM changes
+        # of an inline update are written before the response rather than behind it
+        await get_dispatcher().storage.flush()
+    return reply if reply is not None else {"ok": True}
 
 
 @app.get("/set")
@@ -68,11 +152,15 @@ async def set_webhook() -> dict[str, str]:
     if not webhook_url:
         raise HTTPException(status_code=400, detail="WEBHOOK_URL is not set")
 
-    await bot.set_webhook(url=webhook_url, secret_token=WEBHOOK_SECRET or None)
+    await get_bot().set_webhook(
+        url=webhook_url,
+        secret_token=WEBHOOK_SECRET or None,
+        allowed_updates=sorted(used_update_types()),
+    )
     return {"status": "webhook set", "url": webhook_url}
 
 
 @app.get("/delete")
 async def delete_webhook() -> dict[str, str]:
-    await bot.delete_webhook(drop_pending_updates=False)
+    await get_bot().delete_webhook(drop_pending_updates=False)
     return {"status": "webhook deleted"}
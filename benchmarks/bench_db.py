@@ -0,0 +1,110 @@
+"""Calls/s of hot Database methods: connect-per-call vs. the pooled connections.
+
+Run: python3 benchmarks/bench_db.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import MODELS_PATH, Database  # noqa: E402
+
+DURATION_SECONDS = 2.0
+
+
+class ConnectPerCallDatabase(Database):
+    """The pre-pool behaviour: a fresh aiosqlite connection for every statement."""
+
+    async def init(self) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executescript(MODELS_PATH.read_text(encoding="utf-8"))
+            await db.commit()
+
+    async def _execute(self, query: str, params: tuple[Any, ...] = ()) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(query, params)
+            await db.commit()
+
+    async def _fetchall(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+
+    async def _fetch_rows(self, row_factory, query: str, params: tuple[Any, ...] = ()) -> list[Any]:
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, params) as cursor:
+                cursor.row_factory = row_factory
+                return list(await cursor.fetchall())
+
+
+async def seed(db: Database) -> None:
+    for day in range(1, 6):
+        for lesson in range(1, 8):
+            await db.upsert_schedule_item(
+                day_of_week=day,
+                lesson_number=lesson,
+                subject=f"Предмет {lesson}",
+                room=str(100 + lesson),
+                teacher=None,
+                start_time=f"{7 + lesson:02d}:00",
+                end_time=f"{7 + lesson:02d}:45",
+                is_online=False,
+            )
+
+
+async def measure(name: str, call) -> float:
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < DURATION_SECONDS:
+        await call(calls)
+        calls += 1
+    rate = calls / (time.perf_counter() - started)
+    print(f"  {name:<24} {rate:>10.0f} calls/s")
+    return rate
+
+
+async def run_case(label: str, db: Database) -> dict[str, float]:
+    await db.init()
+    await seed(db)
+    print(label)
+    results = {
+        "get_schedule_for_day": await measure(
+            "get_schedule_for_day", lambda i: db.get_schedule_for_day(i % 5 + 1)
+        ),
+        "save_reminder_sent": await measure(
+            "save_reminder_sent",
+            lambda i: db.save_reminder_sent(
+                date_key="2026-01-01",
+                user_id=i,
+                day_of_week=1,
+                lesson_number=1,
+                reminder_minutes=10,
+            ),
+        ),
+    }
+    await db.close()
+    return results
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        before = await run_case("before (connect per call)", ConnectPerCallDatabase(Path(tmp) / "before.db"))
+        after = await run_case("after (pooled connections)", Database(Path(tmp) / "after.db"))
+
+    print("speedup")
+    for key, value in before.items():
+        print(f"  {key:<24} {after[key] / value:>10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Reminder fan-out: one list of every subscriber's job vs. the paged subscriber stream.
+
+For a growing number of subscribers it reports the time until the first reminder is
+handed to the bot and the peak memory traced during the fan-out. Sends go to a fake
+bot, so only the database and pipeline work is measured.
+
+Run: python3 benchmarks/bench_fanout.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+from bot.models import ScheduleItem  # noqa: E402
+from bot.services.reminder_service import ReminderJob, ReminderService, SendReport  # noqa: E402
+
+SUBSCRIBERS = (10_000, 50_000, 200_000)
+LESSON = ScheduleItem(1, 1, 1, "Алгебра", "101", None, "08:00", "08:45", False)
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.started = 0.0
+        self.first_send: float | None = None
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        if self.first_send is None:
+            self.first_send = time.perf_counter() - self.started
+        self.sent += 1
+
+
+class MaterializingReminderService(ReminderService):
+    """The previous fan-out: every subscriber's job is built and claimed before any send."""
+
+    async def _deliver_lessons(self, lessons, date_key) -> SendReport:
+        jobs: list[ReminderJob] = []
+        cache = await self.db.user_settings_cache()
+        for item, minutes in lessons:
+            text = self._reminder_text(item, minutes)
+            for user_id in cache.subscribers(minutes):
+                jobs.append(ReminderJob(user_id, item.day_of_week, item.lesson_number, minutes, text))
+        return await self._deliver(jobs, date_key)
+
+
+async def measure(service_class: type[ReminderService], subscribers: int, tmp: Path) -> tuple[float, float]:
+    db_path = tmp / f"{service_class.__name__}-{subscribers}.db"
+    db = Database(db_path)
+    await db.init()
+    with sqlite3.connect(db_path) as connection:
+        connection.executemany(
+            "INSERT INTO user_settings (user_id, reminders_enabled, reminder_minutes) VALUES (?, 1, 10)",
+            [(1_000_000 + user_id,) for user_id in range(subscribers)],
+        )
+    bot = FakeBot()
+    service = service_class(bot, db, ZoneInfo("UTC"), send_rate_per_second=1e9)
+    try:
+        await db.user_settings_cache()
+        tracemalloc.start()
+        bot.started = time.perf_counter()
+        await service._deliver_lessons([(LESSON, 10)], "2024-01-01")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert bot.sent == subscribers, bot.sent
+    finally:
+        await db.close()
+    return bot.first_send * 1000, peak / 1024 / 1024
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        print("subscribers | time to first send (ms), peak memory (MiB)")
+        for subscribers in SUBSCRIBERS:
+            before = await measure(MaterializingReminderService, subscribers, Path(tmp))
+            after = await measure(ReminderService, subscribers, Path(tmp))
+            print(
+                f"  {subscribers:>7} | list {before[0]:8.1f} ms {before[1]:7.1f} MiB"
+                f" | stream {after[0]:6.1f} ms {after[1]:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Loading 100k user_settings rows: dict per row vs. the typed row objects of bot.models.
+
+Run: python3 benchmarks/bench_rows.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+from bot.models import UserSettings  # noqa: E402
+
+USERS = 100_000
+RUNS = 5
+QUERY = "SELECT user_id, reminders_enabled, reminder_minutes FROM user_settings"
+
+
+def seed(db_path: Path) -> None:
+    with sqlite3.connect(db_path) as db:
+        db.executemany(
+            "INSERT INTO user_settings (user_id, reminders_enabled, reminder_minutes) VALUES (?, ?, ?)",
+            [(1_000_000 + user_id, user_id % 2, 5 + user_id % 4 * 5) for user_id in range(USERS)],
+        )
+
+
+async def measure(name: str, load) -> None:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        rows = await load()
+        timings.append(time.perf_counter() - started)
+        del rows
+
+    tracemalloc.start()
+    rows = await load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    total = 0
+    for _ in range(RUNS):
+        total += sum(1 for row in rows if access(row))
+    scan = (time.perf_counter() - started) / RUNS
+    print(
+        f"  {name:<22} load {min(timings) * 1000:7.1f} ms | {size / 1024 / 1024:6.1f} MiB"
+        f" | scan {scan * 1000:6.1f} ms"
+    )
+
+
+def access(row) -> bool:
+    if isinstance(row, dict):
+        return bool(row["reminders_enabled"]) and int(row["reminder_minutes"]) == 10
+    return row.reminders_enabled and row.reminder_minutes == 10
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        db = Database(db_path)
+        await db.init()
+        seed(db_path)
+        try:
+            print(f"{USERS} user_settings rows, best of {RUNS} loads")
+            await measure("dict per row", lambda: db._fetchall(QUERY))
+            await measure("UserSettings rows", lambda: db._fetch_rows(UserSettings.from_row, QUERY))
+        finally:
+            await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
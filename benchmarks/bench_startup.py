@@ -0,0 +1,164 @@
+"""Cold-start cost of the serverless entry points.
+
+For api.reminder and api.webhook it reports:
+- the heaviest top-level imports, from `python -X importtime`;
+- time to first response in a fresh interpreter: import, app startup (db.init) and
+  one request driven through the ASGI app, without network or Telegram calls.
+
+Run: python3 benchmarks/bench_startup.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bot.db import Database  # noqa: E402
+
+RUNS = 5
+TOP_IMPORTS = 6
+
+HELP_UPDATE = (
+    b'{"update_id": 1, "message": {"message_id": 1, "date": 1700000000,'
+    b' "chat": {"id": 1, "type": "private"},'
+    b' "from": {"id": 1, "is_bot": false, "first_name": "Bench"},'
+    b' "text": "/help", "entities": [{"type": "bot_command", "offset": 0, "length": 5}]}}'
+)
+
+CHILD = """
+import asyncio, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1], fromlist=["app"])
+imported = time.perf_counter()
+
+async def request(app, method, body):
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": method, "scheme": "http", "path": "/", "raw_path": b"/",
+             "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1),
+             "server": ("127.0.0.1", 80), "headers": [(b"content-type", b"application/json")]}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+async def main():
+    for handler in module.app.router.on_startup:
+        await handler()
+    ready = time.perf_counter()
+    status = await request(module.app, sys.argv[2], sys.argv[3].encode())
+    answered = time.perf_counter()
+    for handler in module.app.router.on_shutdown:
+        await handler()
+    assert status == 200, status
+    print(imported - started, ready - imported, answered - ready)
+
+asyncio.run(main())
+"""
+
+
+def child_env(db_path: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update({"BOT_TOKEN": "123456:bench", "DB_PATH": str(db_path), "PYTHONPATH": str(ROOT)})
+    env.pop("WEBHOOK_BACKGROUND", None)
+    env.pop("WEBHOOK_SECRET", None)
+    env.pop("CRON_SECRET", None)
+    return env
+
+
+def top_imports(module: str, env: dict[str, str]) -> list[tuple[str, float]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only imports made directly by the entry point's own import chain
+        if name.startswith("   ") and not name.startswith("    "):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+
+
+def first_response(module: str, method: str, body: bytes, template_db: Path) -> dict[str, float]:
+    samples: dict[str, list[float]] = {"total": [], "import": [], "startup": [], "request": []}
+    run_db = template_db.with_name("run.db")
+    for _ in range(RUNS):
+        # Every run starts from the same database state (a tick moves next_due_at forward)
+        shutil.copyfile(template_db, run_db)
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, module, method, body.decode()],
+            cwd=ROOT,
+            env=child_env(run_db),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise RuntimeError(f"{module} failed:\n{result.stderr}")
+        samples["total"].append((time.perf_counter() - started) * 1000)
+        for name, value in zip(("import", "startup", "request"), result.stdout.split()):
+            samples[name].append(float(value) * 1000)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+async def prepare_db(db_path: Path, next_due_at: float | None) -> None:
+    db = Database(db_path)
+    try:
+        await db.init()
+        if next_due_at is not None:
+            await db.set_reminder_next_due_at(next_due_at)
+    finally:
+        await db.close()
+
+
+def report(title: str, module: str, method: str, body: bytes, template_db: Path) -> None:
+    timings = first_response(module, method, body, template_db)
+    print(
+        f"  {title:<28} total {timings['total']:7.1f} ms | import {timings['import']:7.1f}"
+        f" | startup {timings['startup']:6.1f} | request {timings['request']:7.1f}"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        idle_db = Path(tmp) / "idle.db"
+        due_db = Path(tmp) / "due.db"
+        asyncio.run(prepare_db(idle_db, time.time() + 3600))
+        asyncio.run(prepare_db(due_db, None))
+
+        for module in ("api.reminder", "api.webhook"):
+            print(f"{module}: heaviest imports (cumulative ms)")
+            for name, cumulative in top_imports(module, child_env(idle_db)):
+                print(f"  {name:<40} {cumulative:8.1f}")
+
+        print(f"Time to first response, median of {RUNS} fresh interpreters (ms)")
+        report("reminder tick, nothing due", "api.reminder", "GET", b"", idle_db)
+        report("reminder tick, due", "api.reminder", "GET", b"", due_db)
+        report("webhook /help", "api.webhook", "POST", HELP_UPDATE, idle_db)
+
+
+if __name__ == "__main__":
+    main()
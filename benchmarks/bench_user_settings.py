@@ -0,0 +1,120 @@
+"""user_settings for 100k users: SQL per call vs. the in-memory UserSettingsCache.
+
+Reports memory of the cache against the same rows held as dicts, and calls/s of the
+lookups the bot makes (one user's settings, one reminder bucket's subscribers).
+
+Run: python3 benchmarks/bench_user_settings.py
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+from bot.user_settings import UserSettingsCache  # noqa: E402
+
+USERS = 100_000
+DURATION_SECONDS = 1.0
+MINUTES = (5, 10, 15, 30)
+
+
+def seed(db_path: Path) -> None:
+    rows = [
+        (1_000_000 + user_id * 7, 1 if user_id % 3 else 0, MINUTES[user_id % len(MINUTES)])
+        for user_id in range(USERS)
+    ]
+    with sqlite3.connect(db_path) as db:
+        db.executemany(
+            "INSERT INTO user_settings (user_id, reminders_enabled, reminder_minutes) VALUES (?, ?, ?)",
+            rows,
+        )
+
+
+def measure_memory(db_path: Path) -> None:
+    with sqlite3.connect(db_path) as db:
+        rows = db.execute(
+            "SELECT user_id, reminders_enabled, reminder_minutes FROM user_settings ORDER BY user_id"
+        ).fetchall()
+    for name, build in (
+        ("dict per row", lambda: {
+            user_id: {"user_id": user_id, "reminders_enabled": enabled, "reminder_minutes": minutes}
+            for user_id, enabled, minutes in rows
+        }),
+        ("UserSettingsCache", lambda: UserSettingsCache(rows)),
+    ):
+        tracemalloc.start()
+        started = time.perf_counter()
+        value = build()
+        elapsed = (time.perf_counter() - started) * 1000
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {name:<24} {size / 1024 / 1024:8.2f} MiB  build {elapsed:6.1f} ms")
+        del value
+
+
+async def measure(name: str, call) -> float:
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < DURATION_SECONDS:
+        await call()
+        calls += 1
+    rate = calls / (time.perf_counter() - started)
+    print(f"  {name:<44} {rate:>10.0f} calls/s")
+    return rate
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        db = Database(db_path)
+        await db.init()
+        seed(db_path)
+        ids = [1_000_000 + user_id * 7 for user_id in range(USERS)]
+
+        print(f"Memory for {USERS} users")
+        measure_memory(db_path)
+
+        async def sql_settings() -> None:
+            await db._fetchone("SELECT * FROM user_settings WHERE user_id = ?", (random.choice(ids),))
+
+        async def sql_bucket() -> None:
+            await db._fetchall(
+                """
+                SELECT user_id, reminders_enabled, reminder_minutes
+                FROM user_settings
+                WHERE reminders_enabled = 1 AND reminder_minutes = ?
+                """,
+                (10,),
+            )
+
+        async def cached_settings() -> None:
+            await db.get_user_settings(random.choice(ids))
+
+        async def cached_bucket() -> None:
+            (await db.user_settings_cache()).subscribers(10)
+
+        try:
+            started = time.perf_counter()
+            await db.user_settings_cache()
+            print(f"Cache load: {(time.perf_counter() - started) * 1000:.1f} ms")
+            print("Lookups")
+            before = await measure("get_user_settings, SQL", sql_settings)
+            after = await measure("get_user_settings, cache", cached_settings)
+            print(f"  speedup {after / before:.1f}x")
+            before = await measure(f"bucket of {USERS // 6} subscribers, SQL", sql_bucket)
+            after = await measure(f"bucket of {USERS // 6} subscribers, cache", cached_bucket)
+            print(f"  speedup {after / before:.1f}x")
+        finally:
+            await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""Throughput of the webhook endpoint for handled and ignored update types.
+
+Drives the ASGI app directly (no network, no Telegram calls): /help is answered in
+the HTTP response, edited_message is an update type no router handles.
+
+Run: python3 benchmarks/bench_webhook.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TMP_DIR = tempfile.TemporaryDirectory()
+os.environ.setdefault("BOT_TOKEN", "123456:bench")
+os.environ["DB_PATH"] = str(Path(TMP_DIR.name) / "bench.db")
+os.environ.pop("WEBHOOK_BACKGROUND", None)
+os.environ.pop("WEBHOOK_SECRET", None)
+
+from api.webhook import app, db  # noqa: E402
+from bot.utils import json_loads  # noqa: E402
+
+ITERATIONS = 3000
+
+
+def make_update(update_id: int, kind: str) -> bytes:
+    message = {
+        "message_id": update_id,
+        "date": 1700000000,
+        "chat": {"id": 1000 + update_id % 50, "type": "private"},
+        "from": {"id": 1000 + update_id % 50, "is_bot": False, "first_name": "Bench"},
+        "text": "/help",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+    }
+    if kind == "edited_message":
+        message["edit_date"] = 1700000001
+    return json.dumps({"update_id": update_id, kind: message}).encode()
+
+
+async def post(body: bytes) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive() -> dict:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(name: str, kind: str) -> float:
+    bodies = [make_update(index, kind) for index in range(ITERATIONS)]
+    assert await post(bodies[0]) == 200
+    started = time.perf_counter()
+    for body in bodies:
+        await post(body)
+    rate = ITERATIONS / (time.perf_counter() - started)
+    print(f"  {name:<32} {rate:>9.0f} updates/s")
+    return rate
+
+
+def measure_decode() -> None:
+    body = make_update(1, "message")
+    for name, loads in (("json.loads", json.loads), ("bot.utils.json_loads", json_loads)):
+        started = time.perf_counter()
+        for _ in range(100_000):
+            loads(body)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:<32} {elapsed / 100_000 * 1e6:>9.2f} us/decode")
+
+
+async def main() -> None:
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    await db.init()
+    try:
+        print(f"Webhook endpoint, {ITERATIONS} updates each")
+        await measure("message /help (handled)", "message")
+        await measure("edited_message (ignored)", "edited_message")
+        print("Body decoding")
+        measure_decode()
+    finally:
+        await db.close()
+        TMP_DIR.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""Latency of rendering /week on a populated DB: seven day queries vs. one week query.
+
+The render cache is bypassed so every call measures the cold path.
+
+Run: python3 benchmarks/bench_week.py
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+from bot.services.schedule_service import ScheduleService  # noqa: E402
+
+ITERATIONS = 2000
+
+
+async def seed(db: Database) -> None:
+    for lesson in range(1, 9):
+        await db.upsert_bell_time(lesson, f"{7 + lesson:02d}:00", f"{7 + lesson:02d}:45")
+    for day in range(1, 7):
+        for lesson in range(1, 9):
+            await db.upsert_schedule_item(
+                day_of_week=day,
+                lesson_number=lesson,
+                subject=f"Предмет {day}.{lesson}",
+                room=str(100 + lesson),
+                teacher="Иванова А.А." if lesson % 2 else None,
+                start_time=None if lesson % 3 else f"{7 + lesson:02d}:05",
+                end_time=None if lesson % 3 else f"{7 + lesson:02d}:50",
+                is_online=lesson == 8,
+            )
+
+
+async def render_week_per_day(service: ScheduleService) -> str:
+    """The previous implementation: one get_schedule_for_day() per weekday."""
+    parts = [await service._render_day(day) for day in range(1, 8)]
+    return "\n\n".join(parts)
+
+
+async def measure(name: str, render) -> float:
+    samples = []
+    for _ in range(ITERATIONS):
+        started = time.perf_counter()
+        await render()
+        samples.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(samples)
+    p95 = statistics.quantiles(samples, n=20)[18]
+    print(f"  {name:<28} median {median:.3f} ms   p95 {p95:.3f} ms")
+    return median
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        await db.init()
+        await seed(db)
+        service = ScheduleService(db)
+
+        assert await render_week_per_day(service) == await service._render_week()
+
+        print(f"/week render, {ITERATIONS} iterations")
+        before = await measure("before (7 day queries)", lambda: render_week_per_day(service))
+        after = await measure("after (1 week query)", service._render_week)
+        print(f"  speedup {before / after:.1f}x")
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""A burst of concurrent settings writes from two Database instances on one file.
+
+Models a whole class pressing /remind_on at once while the worker writes too:
+commit per write vs. the single writer with group commit.
+
+Run: python3 benchmarks/bench_writes.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+
+T = TypeVar("T")
+
+BURST = 2000
+INSTANCES = 2
+
+
+class CommitPerWriteDatabase(Database):
+    """The previous behaviour: every write commits on its own pooled connection."""
+
+    async def _write(self, op: Callable[[sqlite3.Connection], T]) -> T:
+        async with self._connection() as db:
+            # Run the op on the pooled connection's own thread, as the old methods did
+            result = await db._execute(op, db._conn)
+            await db.commit()
+            return result
+
+
+async def burst(db: Database, offset: int) -> int:
+    results = await asyncio.gather(
+        *(db.set_user_reminders_enabled(offset + user_id, True) for user_id in range(BURST)),
+        return_exceptions=True,
+    )
+    return sum(1 for result in results if isinstance(result, Exception))
+
+
+async def run_case(label: str, factory: Callable[[Path], Database], db_path: Path) -> float:
+    instances = [factory(db_path) for _ in range(INSTANCES)]
+    for db in instances:
+        await db.init()
+    try:
+        started = time.perf_counter()
+        errors = await asyncio.gather(*(burst(db, index * BURST) for index, db in enumerate(instances)))
+        elapsed = time.perf_counter() - started
+        writes = BURST * INSTANCES
+        print(f"{label}")
+        print(f"  {writes} writes in {elapsed * 1000:.0f} ms ({writes / elapsed:.0f} writes/s), errors {sum(errors)}")
+        stats = instances[0].write_stats()
+        if stats["batches"]:
+            print(
+                f"  batches {stats['batches']}, avg batch {stats['avg_batch']:.1f},"
+                f" max queue {stats['queue_max']}, commit avg {stats['avg_commit_ms']:.2f} ms"
+                f" / max {stats['max_commit_ms']:.2f} ms"
+            )
+        return elapsed
+    finally:
+        for db in instances:
+            await db.close()
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        before = await run_case("before (commit per write)", CommitPerWriteDatabase, Path(tmp) / "before.db")
+        after = await run_case("after (single writer, group commit)", Database, Path(tmp) / "after.db")
+    print(f"speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
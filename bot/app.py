@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 
-from aiogram import Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types.error_event import ErrorEvent
+if TYPE_CHECKING:
+    from aiogram import Dispatcher
+    from aiogram.types.error_event import ErrorEvent
 
-from .handlers import admin_router, user_router
+    from .db import Database
 
 
 def setup_logging() -> None:
@@ -21,8 +22,16 @@ async def on_error(event: ErrorEvent) -> bool:
     return True
 
 
-def create_dispatcher() -> Dispatcher:
-    dp = Dispatcher(storage=MemoryStorage())
+def create_dispatcher(db: Database) -> Dispatcher:
+    # aiogram and the handlers are imported here so setup_logging() stays cheap for
+    # entry points that may never build a dispatcher
+    from aiogram import Dispatcher
+
+    from .fsm_storage import SQLiteStorage
+    from .handlers import admin_router, user_router
+
+    # Dialog state lives in SQLite so multi-step admin flows survive restarts and cold starts
+    dp = Dispatcher(storage=SQLiteStorage(db))
     dp.include_router(admin_router)
     dp.include_router(user_router)
     dp.errors.register(on_error)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -50,3 +51,9 @@ def load_settings() -> Settings:
         raise RuntimeError(f"Invalid TIMEZONE: {timezone_name}") from exc
 
     return Settings(bot_token=bot_token, admin_ids=admin_ids, timezone=timezone)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings loaded on first use and shared for the rest of the process."""
+    return load_settings()
@@ -1,35 +1,468 @@
 from __future__ import annotations
+import asyncio
+import logging
 import os
+import sqlite3
+import time
+from array import array
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import aiosqlite
 
+from .models import BellTime, OutboxEntry, ReminderBounce, ScheduleItem, UserSettings
+from .user_settings import DEFAULT_REMINDER_MINUTES, DEFAULT_REMINDERS_ENABLED, UserSettingsCache
+
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "school_schedule.db"
 DB_PATH = Path(os.getenv("DB_PATH", str(DEFAULT_DB_PATH)))
 MODELS_PATH = Path(__file__).resolve().parent / "models.sql"
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+MMAP_SIZE = 64 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_MS = 5000
+# How often other processes' writes are looked for; see Database.check_changes()
+CHANGE_CHECK_INTERVAL_MS = int(os.getenv("DB_CHANGE_CHECK_MS", "1000"))
+# Extra wait for more writes before a batch commits; with 0 the writer still batches
+# whatever queued up during the previous commit. See Database._write()
+WRITE_BATCH_WINDOW_MS = float(os.getenv("DB_WRITE_BATCH_MS", "0"))
+WRITE_BATCH_MAX = 256
+# Bump whenever models.sql or _migrate() changes; init() skips the schema script when current
+SCHEMA_VERSION = 5
+
+# Lesson times fall back to the bell schedule when the lesson has none of its own
+SCHEDULE_SELECT = """
+    SELECT
+        s.id,
+        s.day_of_week,
+        s.lesson_number,
+        s.subject,
+        s.room,
+        s.teacher,
+        COALESCE(s.start_time, b.start_time) AS start_time,
+        COALESCE(s.end_time, b.end_time) AS end_time,
+        s.is_online
+    FROM schedule_items AS s
+    LEFT JOIN bell_times AS b ON b.lesson_number = s.lesson_number
+"""
+
+# 100 rows x 6 parameters stays under SQLite's default 999 variable limit
+CLAIM_CHUNK_SIZE = 100
+# Subscriber ids per page of Database.iter_reminder_subscribers()
+SUBSCRIBER_CHUNK_SIZE = 500
+
+META_REMINDER_NEXT_DUE_AT = "reminder_next_due_at"
+META_REMINDER_OUTBOX_DATE = "reminder_outbox_date"
+# Derived reminder state that every schedule or bell write invalidates; settings writes
+# update the outbox rows of their user instead (see Database._update_user_outbox)
+REMINDER_DERIVED_META_KEYS = (META_REMINDER_NEXT_DUE_AT, META_REMINDER_OUTBOX_DATE)
+
+# Stands for reminder_minutes in reminder_outbox_lessons.text_template
+OUTBOX_MINUTES_PLACEHOLDER = "{minutes}"
+
+# Final reminder_log statuses after a claimed reminder was attempted
+REMINDER_DELIVERED = "delivered"
+REMINDER_FAILED = "failed"
+
+OUTBOX_PENDING = "pending"
+OUTBOX_DONE = "done"
+OUTBOX_EXPIRED = "expired"
+
+# One reminder_outbox row per enabled subscriber and not yet started lesson of the day, unless
+# the reminder was already logged. Rows whose fire time has passed are due at once: like
+# process_outbox, only the lesson start (expires_at) ends a reminder's delivery
+OUTBOX_INSERT = f"""
+    INSERT OR IGNORE INTO reminder_outbox (
+        date_key, user_id, day_of_week, lesson_number, reminder_minutes, fire_at, expires_at, text
+    )
+    SELECT
+        :date_key,
+        u.user_id,
+        l.day_of_week,
+        l.lesson_number,
+        u.reminder_minutes,
+        l.starts_at - u.reminder_minutes * 60,
+        l.starts_at,
+        replace(l.text_template, '{OUTBOX_MINUTES_PLACEHOLDER}', u.reminder_minutes)
+    FROM reminder_outbox_lessons AS l
+    JOIN user_settings AS u ON u.reminders_enabled = 1
+    WHERE l.starts_at > :now
+      AND NOT EXISTS (
+          SELECT 1
+          FROM reminder_log AS r
+          WHERE r.date_key = :date_key
+            AND r.user_id = u.user_id
+            AND r.day_of_week = l.day_of_week
+            AND r.lesson_number = l.lesson_number
+            AND r.reminder_minutes = u.reminder_minutes
+      )
+"""
+
+# Change topics passed to listeners registered with Database.add_change_listener
+TOPIC_SCHEDULE = "schedule"
+TOPIC_BELLS = "bells"
+TOPIC_USER_SETTINGS = "user_settings"
+TOPIC_FSM = "fsm"
+CHANGE_TOPICS = (TOPIC_SCHEDULE, TOPIC_BELLS, TOPIC_USER_SETTINGS, TOPIC_FSM)
+# Per-topic version counters in meta, bumped in the same transaction as the write
+VERSION_META_PREFIX = "version:"
+
+T = TypeVar("T")
+R = TypeVar("R")
+WriteOp = Callable[[sqlite3.Connection], Any]
+
 
 class Database:
-    def __init__(self, db_path: Path = DB_PATH):
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        pool_size: int = DB_POOL_SIZE,
+        change_check_interval_ms: int = CHANGE_CHECK_INTERVAL_MS,
+    ):
         self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.change_check_interval = change_check_interval_ms / 1000
+        self._pool: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._connections: list[aiosqlite.Connection] = []
+        self._opened = 0
+        self._pool_lock = asyncio.Lock()
+        self._change_listeners: list[Callable[[str], None]] = []
+        # Bumped by every schedule/bell write; render caches compare against it
+        self.schedule_version = 0
+        # Dedicated connection for PRAGMA data_version, which is tracked per connection
+        self._watch_db: aiosqlite.Connection | None = None
+        self._watch_lock = asyncio.Lock()
+        self._data_version: int | None = None
+        self._topic_versions: dict[str, int] = {}
+        self._changes_checked_at = float("-inf")
+        # Write-through copy of user_settings, loaded on first use
+        self._user_settings: UserSettingsCache | None = None
+        self._user_settings_lock = asyncio.Lock()
+        self._user_settings_generation = 0
+        # Every write goes through one writer task; its connection lives on a dedicated
+        # thread so a whole batch runs there in a single hop
+        self.write_batch_window = WRITE_BATCH_WINDOW_MS / 1000
+        self._write_executor: ThreadPoolExecutor | None = None
+        self._write_db: sqlite3.Connection | None = None
+        self._write_queue: asyncio.Queue[tuple[WriteOp, asyncio.Future] | None] | None = None
+        self._writer: asyncio.Task | None = None
+        self.write_ops = 0
+        self.write_failures = 0
+        self.write_batches = 0
+        self.write_queue_max = 0
+        self.commit_seconds_total = 0.0
+        self.commit_seconds_max = 0.0
 
     async def init(self) -> None:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        async with aiosqlite.connect(self.db_path) as db:
+        await self._open_pool()
+        async with self._connection() as db:
+            async with db.execute("PRAGMA user_version") as cursor:
+                version = (await cursor.fetchone())[0]
+            if version >= SCHEMA_VERSION:
+                return
             schema = MODELS_PATH.read_text(encoding="utf-8")
             await db.executescript(schema)
+            await self._migrate(db)
+            await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             await db.commit()
+            logging.info("Database schema upgraded from version %s to %s", version, SCHEMA_VERSION)
+
+    async def _migrate(self, db: aiosqlite.Connection) -> None:
+        # Columns added after the first release; CREATE TABLE IF NOT EXISTS keeps old tables as is
+        async with db.execute("PRAGMA table_info(reminder_log)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "status" not in columns:
+            await db.execute(
+                "ALTER TABLE reminder_log ADD COLUMN status TEXT NOT NULL DEFAULT 'delivered'"
+            )
+        # Replaced by the partial idx_user_settings_subscribers
+        await db.execute("DROP INDEX IF EXISTS idx_user_settings_reminders")
+        # An outbox materialized before reminder_outbox_lessons existed is rebuilt by the next tick
+        await db.execute("DELETE FROM meta WHERE key IN (?, ?)", REMINDER_DERIVED_META_KEYS)
+
+    async def close(self) -> None:
+        if self._writer is not None and not self._writer.done():
+            # The writer commits everything queued before the sentinel, then exits
+            self._write_queue.put_nowait(None)
+            await self._writer
+        self._writer = None
+        self._write_queue = None
+        if self._write_executor is not None:
+            await asyncio.get_running_loop().run_in_executor(self._write_executor, self._close_write_db)
+            self._write_executor.shutdown(wait=False)
+            self._write_executor = None
+        async with self._pool_lock:
+            connections, self._connections = self._connections, []
+            self._pool = None
+            self._opened = 0
+            for db in connections:
+                await db.close()
+        async with self._watch_lock:
+            if self._watch_db is not None:
+                await self._watch_db.close()
+            self._watch_db = None
+            self._data_version = None
+            self._topic_versions = {}
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str], None]) -> None:
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify_change(self, topic: str) -> None:
+        if topic in (TOPIC_SCHEDULE, TOPIC_BELLS):
+            self.schedule_version += 1
+        for listener in list(self._change_listeners):
+            try:
+                listener(topic)
+            except Exception:  # pragma: no cover - defensive
+                logging.exception("Change listener failed for topic=%s", topic)
+
+    async def check_changes(self, force: bool = False) -> None:
+        """Notify listeners about writes committed by other processes.
+
+        Runs at most once per change_check_interval. Until another connection commits,
+        a check is a single PRAGMA data_version; then the per-topic versions are read.
+        """
+        now = time.monotonic()
+        if not force and now - self._changes_checked_at < self.change_check_interval:
+            return
+        self._changes_checked_at = now
+        async with self._watch_lock:
+            if self._watch_db is None:
+                self._watch_db = await self._open_connection()
+            async with self._watch_db.execute("PRAGMA data_version") as cursor:
+                data_version = (await cursor.fetchone())[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            async with self._watch_db.execute(
+                "SELECT key, value FROM meta WHERE key LIKE ?",
+                (f"{VERSION_META_PREFIX}%",),
+            ) as cursor:
+                stored = {row[0][len(VERSION_META_PREFIX):]: int(row[1]) for row in await cursor.fetchall()}
+
+        first_check = not self._topic_versions
+        changed = [topic for topic in CHANGE_TOPICS if stored.get(topic, 0) != self._topic_versions.get(topic, 0)]
+        self._topic_versions = {topic: stored.get(topic, 0) for topic in CHANGE_TOPICS}
+        if first_check:
+            # The first check only records the baseline; nothing was cached before it
+            return
+        for topic in changed:
+            logging.info("Database changed by another process: %s", topic)
+            if topic == TOPIC_USER_SETTINGS:
+                self._drop_user_settings_cache()
+            self._notify_change(topic)
+
+    @staticmethod
+    def _bump_version(db: sqlite3.Connection, topic: str) -> int:
+        row = db.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(meta.value AS INTEGER) + 1
+            RETURNING value
+            """,
+            (f"{VERSION_META_PREFIX}{topic}",),
+        ).fetchone()
+        return int(row[0])
+
+    def _record_own_version(self, topic: str, version: int) -> None:
+        # Our own write is notified directly, so the next check must not report it again
+        if self._topic_versions and version == self._topic_versions.get(topic, 0) + 1:
+            self._topic_versions[topic] = version
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        db.row_factory = aiosqlite.Row
+        # Connection-level settings are applied once per pooled connection
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        await db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return db
+
+    async def _open_pool(self) -> None:
+        async with self._pool_lock:
+            if self._pool is not None:
+                return
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Connections are opened on demand up to pool_size, so a cold start pays for one
+            self._pool = asyncio.Queue()
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self._pool is None:
+            await self._open_pool()
+        pool = self._pool
+        if pool.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            try:
+                db = await self._open_connection()
+            except BaseException:
+                self._opened -= 1
+                raise
+            self._connections.append(db)
+        else:
+            db = await pool.get()
+        try:
+            yield db
+        except BaseException:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+        finally:
+            pool.put_nowait(db)
+
+    def write_stats(self) -> dict[str, Any]:
+        batches = self.write_batches
+        return {
+            "queue_depth": self._write_queue.qsize() if self._write_queue else 0,
+            "queue_max": self.write_queue_max,
+            "ops": self.write_ops,
+            "failures": self.write_failures,
+            "batches": batches,
+            "avg_batch": self.write_ops / batches if batches else 0.0,
+            "avg_commit_ms": self.commit_seconds_total / batches * 1000 if batches else 0.0,
+            "max_commit_ms": self.commit_seconds_max * 1000,
+        }
+
+    async def _write(self, op: Callable[[sqlite3.Connection], T]) -> T:
+        """Run op on the writer thread's connection; returns once it is committed.
+
+        Writes queued close together are group-committed in one transaction. Ops are
+        plain synchronous functions and must not commit; a failing op is retried alone
+        so it does not fail its batch.
+        """
+        if self._writer is None or self._writer.done():
+            self._write_queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop(self._write_queue), name="db-writer")
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((op, future))
+        self.write_queue_max = max(self.write_queue_max, self._write_queue.qsize())
+        return await future
+
+    async def _write_loop(self, queue: asyncio.Queue[tuple[WriteOp, asyncio.Future] | None]) -> None:
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # Even a zero window yields once, letting writes issued in the same burst join
+            await asyncio.sleep(self.write_batch_window)
+            while len(batch) < WRITE_BATCH_MAX and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await self._run_transaction([op for op, _ in batch])
+        except Exception as exc:
+            if len(batch) > 1 and not isinstance(exc, sqlite3.OperationalError):
+                # One op failed and took the shared transaction with it: run each op on
+                # its own so only the failing caller sees the error
+                logging.warning("Write batch of %s ops failed (%s), retrying one by one", len(batch), exc)
+                for item in batch:
+                    await self._commit_batch([item])
+                return
+            self._fail_batch(batch, exc)
+            return
+        except BaseException as exc:
+            self._fail_batch(batch, exc)
+            raise
+
+        elapsed = time.perf_counter() - started
+        self.write_batches += 1
+        self.write_ops += len(batch)
+        self.commit_seconds_total += elapsed
+        self.commit_seconds_max = max(self.commit_seconds_max, elapsed)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run_transaction(self, ops: list[WriteOp]) -> list[Any]:
+        if self._write_executor is None:
+            self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._write_executor, self._run_transaction_sync, ops
+        )
+
+    def _run_transaction_sync(self, ops: list[WriteOp]) -> list[Any]:
+        if self._write_db is None:
+            # Autocommit mode: transactions are opened explicitly below
+            db = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._write_db = db
+        db = self._write_db
+        try:
+            # IMMEDIATE takes the write lock up front (busy_timeout covers other processes)
+            db.execute("BEGIN IMMEDIATE")
+            results = [op(db) for op in ops]
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        return results
+
+    def _close_write_db(self) -> None:
+        if self._write_db is not None:
+            self._write_db.close()
+            self._write_db = None
+
+    def _fail_batch(self, batch: list[tuple[WriteOp, asyncio.Future]], exc: BaseException) -> None:
+        self.write_failures += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
 
     async def _execute(self, query: str, params: tuple[Any, ...] = ()) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(query, params)
-            await db.commit()
+        await self._write(lambda db: db.execute(query, params).rowcount)
+
+    async def _execute_change(
+        self,
+        query: str,
+        params: tuple[Any, ...],
+        topic: str,
+        after: WriteOp,
+    ) -> int:
+        """Run a schedule/bell/settings write and update the derived reminder state.
+
+        `after` runs in the same transaction when the write changed a row.
+        """
+
+        def op(db: sqlite3.Connection) -> tuple[int, int]:
+            changed = db.execute(query, params).rowcount
+            if not changed:
+                return 0, 0
+            after(db)
+            return changed, self._bump_version(db, topic)
+
+        changed, version = await self._write(op)
+        if changed:
+            self._record_own_version(topic, version)
+            self._notify_change(topic)
+        return changed
+
+    async def _executemany(self, query: str, rows: Iterable[tuple[Any, ...]]) -> None:
+        rows = list(rows)
+        await self._write(lambda db: db.executemany(query, rows).rowcount)
 
     async def _fetchall(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connection() as db:
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 return [dict(row) for row in rows]
@@ -38,6 +471,18 @@ class Database:
         rows = await self._fetchall(query, params)
         return rows[0] if rows else None
 
+    async def _fetch_rows(
+        self,
+        row_factory: Callable[[sqlite3.Cursor, tuple], R],
+        query: str,
+        params: tuple[Any, ...] = (),
+    ) -> list[R]:
+        """Like _fetchall, but every row is built by row_factory from the raw tuple."""
+        async with self._connection() as db:
+            async with db.execute(query, params) as cursor:
+                cursor.row_factory = row_factory
+                return list(await cursor.fetchall())
+
     async def upsert_schedule_item(
         self,
         day_of_week: int,
@@ -62,7 +507,7 @@ class Database:
             end_time = excluded.end_time,
             is_online = excluded.is_online
         """
-        await self._execute(
+        await self._execute_change(
             query,
             (
                 day_of_week,
@@ -74,39 +519,46 @@ class Database:
                 end_time,
                 1 if is_online else 0,
             ),
+            TOPIC_SCHEDULE,
+            lambda db: self._drop_lesson_outbox(db, lesson_number, day_of_week),
         )
 
     async def delete_schedule_item(self, day_of_week: int, lesson_number: int) -> int:
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "DELETE FROM schedule_items WHERE day_of_week = ? AND lesson_number = ?",
-                (day_of_week, lesson_number),
-            )
-            await db.commit()
-            return cursor.rowcount
+        return await self._execute_change(
+            "DELETE FROM schedule_items WHERE day_of_week = ? AND lesson_number = ?",
+            (day_of_week, lesson_number),
+            TOPIC_SCHEDULE,
+            lambda db: self._drop_lesson_outbox(db, lesson_number, day_of_week),
+        )
 
-    async def get_schedule_for_day(self, day_of_week: int) -> list[dict[str, Any]]:
-        return await self._fetchall(
-            """
-            SELECT *
-            FROM schedule_items
-            WHERE day_of_week = ?
-            ORDER BY lesson_number ASC
+    async def get_schedule_for_day(self, day_of_week: int) -> list[ScheduleItem]:
+        return await self._fetch_rows(
+            ScheduleItem.from_row,
+            f"""
+            {SCHEDULE_SELECT}
+            WHERE s.day_of_week = ?
+            ORDER BY s.lesson_number ASC
             """,
             (day_of_week,),
         )
 
-    async def get_schedule_for_week(self) -> list[dict[str, Any]]:
-        return await self._fetchall(
-            """
-            SELECT *
-            FROM schedule_items
-            ORDER BY day_of_week ASC, lesson_number ASC
+    async def get_schedule_for_week(self) -> list[ScheduleItem]:
+        return await self._fetch_rows(
+            ScheduleItem.from_row,
+            f"""
+            {SCHEDULE_SELECT}
+            ORDER BY s.day_of_week ASC, s.lesson_number ASC
             """
         )
 
     async def set_user_reminders_enabled(self, user_id: int, enabled: bool) -> None:
-        await self._execute(
+        def after(db: sqlite3.Connection) -> None:
+            if enabled:
+                # Turning reminders back on gives a bounced user a fresh start
+                db.execute("DELETE FROM reminder_bounces WHERE user_id = ?", (user_id,))
+            self._update_user_outbox(db, user_id)
+
+        await self._execute_change(
             """
             INSERT INTO user_settings (user_id, reminders_enabled)
             VALUES (?, ?)
@@ -114,10 +566,13 @@ class Database:
             DO UPDATE SET reminders_enabled = excluded.reminders_enabled
             """,
             (user_id, 1 if enabled else 0),
+            TOPIC_USER_SETTINGS,
+            after,
         )
+        self._update_user_settings_cache(user_id, enabled=enabled)
 
     async def set_user_reminder_minutes(self, user_id: int, minutes: int) -> None:
-        await self._execute(
+        await self._execute_change(
             """
             INSERT INTO user_settings (user_id, reminder_minutes)
             VALUES (?, ?)
@@ -125,32 +580,89 @@ class Database:
             DO UPDATE SET reminder_minutes = excluded.reminder_minutes
             """,
             (user_id, minutes),
+            TOPIC_USER_SETTINGS,
+            lambda db: self._update_user_outbox(db, user_id),
         )
+        self._update_user_settings_cache(user_id, minutes=minutes)
 
-    async def get_user_settings(self, user_id: int) -> dict[str, Any]:
-        row = await self._fetchone(
-            "SELECT * FROM user_settings WHERE user_id = ?",
-            (user_id,),
-        )
-        if row:
-            return row
-        return {
-            "user_id": user_id,
-            "reminders_enabled": 0,
-            "reminder_minutes": 10,
-        }
+    def _drop_user_settings_cache(self) -> None:
+        self._user_settings = None
+        self._user_settings_generation += 1
 
-    async def get_reminder_subscribers(self) -> list[dict[str, Any]]:
-        return await self._fetchall(
-            """
-            SELECT user_id, reminders_enabled, reminder_minutes
-            FROM user_settings
-            WHERE reminders_enabled = 1
-            """
-        )
+    def _update_user_settings_cache(self, user_id: int, **changes: Any) -> None:
+        if self._user_settings is not None:
+            self._user_settings.update(user_id, **changes)
+        else:
+            # A load that is still reading may have missed this write
+            self._user_settings_generation += 1
+
+    async def user_settings_cache(self) -> UserSettingsCache:
+        """The in-memory user_settings, loaded once and kept current by the setters."""
+        await self.check_changes()
+        if self._user_settings is not None:
+            return self._user_settings
+        async with self._user_settings_lock:
+            if self._user_settings is None:
+                generation = self._user_settings_generation
+                async with self._connection() as db:
+                    async with db.execute(
+                        """
+                        SELECT user_id, reminders_enabled, reminder_minutes
+                        FROM user_settings
+                        ORDER BY user_id
+                        """
+                    ) as cursor:
+                        cache = UserSettingsCache(tuple(row) for row in await cursor.fetchall())
+                # Another process changed the table while we were reading it: retry next time
+                if generation != self._user_settings_generation:
+                    return cache
+                self._user_settings = cache
+            return self._user_settings
+
+    async def get_user_settings(self, user_id: int) -> UserSettings:
+        settings = (await self.user_settings_cache()).get(user_id)
+        if settings is None:
+            return UserSettings(user_id, DEFAULT_REMINDERS_ENABLED, DEFAULT_REMINDER_MINUTES)
+        return UserSettings(user_id, *settings)
+
+    async def iter_reminder_subscribers(
+        self, reminder_minutes: int, chunk_size: int = SUBSCRIBER_CHUNK_SIZE
+    ) -> AsyncIterator[array]:
+        """Enabled subscriber ids of one bucket in user_id order, chunk_size ids at a time.
+
+        Pages are keyset-paginated on user_id, so settings changed between pages neither
+        repeat nor skip the users that were already yielded.
+        """
+        after_user_id = -(2**63)
+        while True:
+            await self.check_changes()
+            if self._user_settings is not None:
+                chunk = self._user_settings.subscribers_after(reminder_minutes, after_user_id, chunk_size)
+            else:
+                async with self._connection() as db:
+                    async with db.execute(
+                        """
+                        SELECT user_id
+                        FROM user_settings
+                        WHERE reminders_enabled = 1 AND reminder_minutes = ? AND user_id > ?
+                        ORDER BY user_id
+                        LIMIT ?
+                        """,
+                        (reminder_minutes, after_user_id, chunk_size),
+                    ) as cursor:
+                        chunk = array("q", [row[0] for row in await cursor.fetchall()])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after_user_id = chunk[-1]
+
+    async def get_reminder_buckets(self) -> dict[int, int]:
+        return (await self.user_settings_cache()).buckets()
 
     async def upsert_bell_time(self, lesson_number: int, start_time: str, end_time: str) -> None:
-        await self._execute(
+        await self._execute_change(
             """
             INSERT INTO bell_times (lesson_number, start_time, end_time)
             VALUES (?, ?, ?)
@@ -160,41 +672,16 @@ class Database:
                 end_time = excluded.end_time
             """,
             (lesson_number, start_time, end_time),
+            TOPIC_BELLS,
+            lambda db: self._drop_lesson_outbox(db, lesson_number),
         )
 
-    async def get_bell_times(self) -> list[dict[str, Any]]:
-        return await self._fetchall(
-            "SELECT * FROM bell_times ORDER BY lesson_number ASC"
+    async def get_bell_times(self) -> list[BellTime]:
+        return await self._fetch_rows(
+            BellTime.from_row,
+            "SELECT lesson_number, start_time, end_time FROM bell_times ORDER BY lesson_number ASC",
         )
 
-    async def get_bell_time(self, lesson_number: int) -> dict[str, Any] | None:
-        return await self._fetchone(
-            "SELECT * FROM bell_times WHERE lesson_number = ?",
-            (lesson_number,),
-        )
-
-    async def reminder_already_sent(
-        self,
-        date_key: str,
-        user_id: int,
-        day_of_week: int,
-        lesson_number: int,
-        reminder_minutes: int,
-    ) -> bool:
-        row = await self._fetchone(
-            """
-            SELECT id
-            FROM reminder_log
-            WHERE date_key = ?
-              AND user_id = ?
-              AND day_of_week = ?
-              AND lesson_number = ?
-              AND reminder_minutes = ?
-            """,
-            (date_key, user_id, day_of_week, lesson_number, reminder_minutes),
-        )
-        return row is not None
-
     async def save_reminder_sent(
         self,
         date_key: str,
@@ -219,6 +706,358 @@ class Database:
             ),
         )
 
+    async def claim_reminders(
+        self, rows: list[tuple[str, int, int, int, int]]
+    ) -> set[tuple[int, int, int, int]]:
+        """Atomically claim (date_key, user_id, day_of_week, lesson_number, reminder_minutes) rows.
+
+        Returns the (user_id, day_of_week, lesson_number, reminder_minutes) keys this caller
+        inserted; rows already logged by another tick or process are left out.
+        """
+        if not rows:
+            return set()
+        claimed_at = datetime.now(timezone.utc).isoformat()
+
+        def op(db: sqlite3.Connection) -> set[tuple[int, int, int, int]]:
+            claimed: set[tuple[int, int, int, int]] = set()
+            for start in range(0, len(rows), CLAIM_CHUNK_SIZE):
+                chunk = rows[start : start + CLAIM_CHUNK_SIZE]
+                placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, 'claimed')"] * len(chunk))
+                params = [value for row in chunk for value in (*row, claimed_at)]
+                cursor = db.execute(
+                    f"""
+                    INSERT INTO reminder_log (
+                        date_key, user_id, day_of_week, lesson_number, reminder_minutes, sent_at, status
+                    ) VALUES {placeholders}
+                    ON CONFLICT(date_key, user_id, day_of_week, lesson_number, reminder_minutes) DO NOTHING
+                    RETURNING user_id, day_of_week, lesson_number, reminder_minutes
+                    """,
+                    params,
+                )
+                for row in cursor.fetchall():
+                    claimed.add((int(row[0]), int(row[1]), int(row[2]), int(row[3])))
+            return claimed
+
+        return await self._write(op)
+
+    async def set_reminders_status(
+        self, rows: Iterable[tuple[str, int, int, int, int]], status: str
+    ) -> None:
+        """Mark claimed rows as 'delivered' or 'failed' in one commit.
+
+        A delivery also clears the recipient's bounce count.
+        """
+        finished_at = datetime.now(timezone.utc).isoformat()
+        params = [(status, finished_at, *row) for row in rows]
+
+        def op(db: sqlite3.Connection) -> None:
+            db.executemany(
+                """
+                UPDATE reminder_log
+                SET status = ?, sent_at = ?
+                WHERE date_key = ?
+                  AND user_id = ?
+                  AND day_of_week = ?
+                  AND lesson_number = ?
+                  AND reminder_minutes = ?
+                """,
+                params,
+            )
+            has_bounces = db.execute("SELECT 1 FROM reminder_bounces LIMIT 1").fetchone()
+            if status == REMINDER_DELIVERED and has_bounces:
+                db.executemany(
+                    "DELETE FROM reminder_bounces WHERE user_id = ?",
+                    [(row[3],) for row in params],
+                )
+
+        await self._write(op)
+
+    async def record_reminder_bounces(self, bounces: Iterable[tuple[int, str]], threshold: int) -> list[int]:
+        """Count undeliverable reminders as (user_id, reason) pairs.
+
+        Users reaching `threshold` consecutive bounces get reminders disabled; returns their ids.
+        """
+        bounces = list(bounces)
+        bounced_at = datetime.now(timezone.utc).isoformat()
+
+        def op(db: sqlite3.Connection) -> tuple[list[int], int]:
+            disabled: list[int] = []
+            for user_id, reason in bounces:
+                (count,) = db.execute(
+                    """
+                    INSERT INTO reminder_bounces (user_id, reason, bounces, last_bounce_at)
+                    VALUES (?, ?, 1, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET
+                        reason = excluded.reason,
+                        bounces = bounces + 1,
+                        last_bounce_at = excluded.last_bounce_at
+                    RETURNING bounces
+                    """,
+                    (user_id, reason, bounced_at),
+                ).fetchone()
+                if count < threshold:
+                    continue
+                if db.execute(
+                    """
+                    UPDATE user_settings SET reminders_enabled = 0
+                    WHERE user_id = ? AND reminders_enabled = 1
+                    """,
+                    (user_id,),
+                ).rowcount:
+                    db.execute(
+                        "UPDATE reminder_bounces SET disabled_at = ? WHERE user_id = ?",
+                        (bounced_at, user_id),
+                    )
+                    self._update_user_outbox(db, user_id)
+                    disabled.append(user_id)
+            if not disabled:
+                return disabled, 0
+            return disabled, self._bump_version(db, TOPIC_USER_SETTINGS)
+
+        if not bounces:
+            return []
+        disabled, version = await self._write(op)
+        if disabled:
+            self._record_own_version(TOPIC_USER_SETTINGS, version)
+            for user_id in disabled:
+                self._update_user_settings_cache(user_id, enabled=False)
+            self._notify_change(TOPIC_USER_SETTINGS)
+        return disabled
+
+    async def get_reminder_bounces(self, limit: int = 20) -> list[ReminderBounce]:
+        return await self._fetch_rows(
+            ReminderBounce.from_row,
+            """
+            SELECT user_id, reason, bounces, last_bounce_at, disabled_at
+            FROM reminder_bounces
+            ORDER BY bounces DESC, last_bounce_at DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+
+    async def get_reminder_bounce_counts(self) -> dict[str, tuple[int, int]]:
+        """reason -> (bounced users, users with reminders disabled)."""
+        async with self._connection() as db:
+            async with db.execute(
+                """
+                SELECT reason, COUNT(*), COUNT(disabled_at)
+                FROM reminder_bounces
+                GROUP BY reason
+                ORDER BY COUNT(*) DESC
+                """
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return {row[0]: (int(row[1]), int(row[2])) for row in rows}
+
+    async def get_meta(self, key: str) -> str | None:
+        async with self._connection() as db:
+            async with db.execute("SELECT value FROM meta WHERE key = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_meta(self, key: str, value: str) -> None:
+        await self._execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (key, value),
+        )
+
+    async def get_reminder_next_due_at(self) -> float | None:
+        value = await self.get_meta(META_REMINDER_NEXT_DUE_AT)
+        return float(value) if value is not None else None
+
+    async def set_reminder_next_due_at(self, timestamp: float) -> None:
+        await self.set_meta(META_REMINDER_NEXT_DUE_AT, repr(timestamp))
+
+    async def replace_pending_outbox(
+        self,
+        date_key: str,
+        lessons: list[tuple[int, int, float, str]],
+        now_ts: float,
+    ) -> int:
+        """Rebuild the future pending reminder_outbox rows for date_key.
+
+        lessons are (day_of_week, lesson_number, starts_at, text_template) of that day; one row
+        is created per lesson and enabled subscriber who has no reminder_log row yet. Every
+        pending row is replaced, so none keeps the time or text of an edited lesson; due ones
+        of lessons that have not started are created again.
+        """
+
+        def op(db: sqlite3.Connection) -> int:
+            db.execute(
+                "DELETE FROM reminder_outbox WHERE date_key < ? OR status = ?",
+                (date_key, OUTBOX_PENDING),
+            )
+            db.execute("DELETE FROM reminder_outbox_lessons")
+            db.executemany(
+                """
+                INSERT INTO reminder_outbox_lessons (day_of_week, lesson_number, starts_at, text_template)
+                VALUES (?, ?, ?, ?)
+                """,
+                lessons,
+            )
+            inserted = db.execute(OUTBOX_INSERT, {"date_key": date_key, "now": now_ts}).rowcount
+            db.execute(
+                """
+                INSERT INTO meta (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """,
+                (META_REMINDER_OUTBOX_DATE, date_key),
+            )
+            return inserted
+
+        return await self._write(op)
+
+    @staticmethod
+    def _drop_lesson_outbox(
+        db: sqlite3.Connection,
+        lesson_number: int,
+        day_of_week: int | None = None,
+    ) -> None:
+        """Forget the pending reminders of a lesson whose schedule row or bell time changed.
+
+        Runs inside the edit, so no tick can send the old time or room before the next
+        one rebuilds the outbox. Without day_of_week (a bell change) every day's lesson
+        with that number is dropped.
+        """
+        day_filter = ""
+        params: tuple[int, ...] = (lesson_number,)
+        if day_of_week is not None:
+            day_filter = "AND day_of_week = ?"
+            params = (lesson_number, day_of_week)
+        db.execute(
+            f"DELETE FROM reminder_outbox WHERE status = ? AND lesson_number = ? {day_filter}",
+            (OUTBOX_PENDING, *params),
+        )
+        db.execute(f"DELETE FROM reminder_outbox_lessons WHERE lesson_number = ? {day_filter}", params)
+        db.execute("DELETE FROM meta WHERE key IN (?, ?)", REMINDER_DERIVED_META_KEYS)
+
+    @staticmethod
+    def _update_user_outbox(db: sqlite3.Connection, user_id: int) -> None:
+        """Redo one user's pending reminder_outbox rows after a change to their settings.
+
+        Runs inside the settings write, so the rest of the materialized outbox and the
+        cron short-circuit (meta.reminder_next_due_at) stay valid.
+        """
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (META_REMINDER_OUTBOX_DATE,)).fetchone()
+        if row is None:
+            # Not materialized yet: the next tick builds the outbox from current settings
+            return
+        date_key = row[0]
+        db.execute(
+            "DELETE FROM reminder_outbox WHERE user_id = ? AND date_key = ? AND status = ?",
+            (user_id, date_key, OUTBOX_PENDING),
+        )
+        db.execute(
+            f"{OUTBOX_INSERT} AND u.user_id = :user_id",
+            {"date_key": date_key, "now": time.time(), "user_id": user_id},
+        )
+        (next_fire_at,) = db.execute(
+            "SELECT MIN(fire_at) FROM reminder_outbox WHERE user_id = ? AND date_key = ? AND status = ?",
+            (user_id, date_key, OUTBOX_PENDING),
+        ).fetchone()
+        if next_fire_at is not None:
+            # Only ever moves the next due time earlier; a missing value already means "due"
+            db.execute(
+                "UPDATE meta SET value = ? WHERE key = ? AND CAST(value AS REAL) > ?",
+                (repr(float(next_fire_at)), META_REMINDER_NEXT_DUE_AT, next_fire_at),
+            )
+
+    async def get_due_outbox(
+        self,
+        now_ts: float,
+        limit: int,
+        shard: int = 0,
+        shards: int = 1,
+    ) -> list[OutboxEntry]:
+        shard_filter = "AND ABS(user_id) % ? = ?" if shards > 1 else ""
+        shard_params: tuple[int, ...] = (shards, shard) if shards > 1 else ()
+        return await self._fetch_rows(
+            OutboxEntry.from_row,
+            f"""
+            SELECT id, date_key, user_id, day_of_week, lesson_number, reminder_minutes,
+                   fire_at, expires_at, text
+            FROM reminder_outbox
+            WHERE status = ? AND fire_at <= ? {shard_filter}
+            ORDER BY fire_at ASC
+            LIMIT ?
+            """,
+            (OUTBOX_PENDING, now_ts, *shard_params, limit),
+        )
+
+    async def set_outbox_status(self, ids: Iterable[int], status: str) -> None:
+        await self._executemany(
+            "UPDATE reminder_outbox SET status = ? WHERE id = ?",
+            [(status, outbox_id) for outbox_id in ids],
+        )
+
+    async def get_outbox_next_fire_at(self) -> float | None:
+        async with self._connection() as db:
+            async with db.execute(
+                "SELECT MIN(fire_at) FROM reminder_outbox WHERE status = ?",
+                (OUTBOX_PENDING,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    async def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """Take or renew the named lease; False while another live holder owns it."""
+        now_ts = time.time()
+
+        def op(db: sqlite3.Connection) -> bool:
+            cursor = db.execute(
+                """
+                INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    holder = excluded.holder,
+                    expires_at = excluded.expires_at
+                WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+                """,
+                (name, holder, now_ts + ttl_seconds, now_ts),
+            )
+            return cursor.rowcount > 0
+
+        return await self._write(op)
+
+    async def release_lease(self, name: str, holder: str) -> None:
+        await self._execute(
+            "DELETE FROM leases WHERE name = ? AND holder = ?",
+            (name, holder),
+        )
+
+    async def get_fsm_record(self, key: str) -> dict[str, Any] | None:
+        return await self._fetchone("SELECT state, data FROM fsm_storage WHERE key = ?", (key,))
+
+    async def save_fsm_records(
+        self,
+        upserts: list[tuple[str, str | None, str]],
+        deletes: list[str],
+    ) -> None:
+        """Persist (key, state, data) rows and drop emptied keys in one transaction."""
+
+        def op(db: sqlite3.Connection) -> int:
+            if upserts:
+                db.executemany(
+                    """
+                    INSERT INTO fsm_storage (key, state, data) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        state = excluded.state,
+                        data = excluded.data
+                    """,
+                    upserts,
+                )
+            if deletes:
+                db.executemany(
+                    "DELETE FROM fsm_storage WHERE key = ?",
+                    [(key,) for key in deletes],
+                )
+            return self._bump_version(db, TOPIC_FSM)
+
+        self._record_own_version(TOPIC_FSM, await self._write(op))
+
     async def cleanup_old_reminder_log(self, keep_days: int = 7) -> None:
         border = (datetime.now(timezone.utc) - timedelta(days=keep_days)).strftime("%Y-%m-%d")
         await self._execute(
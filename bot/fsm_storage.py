@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from .db import TOPIC_FSM, Database
+from .utils import json_loads
+
+FSM_FLUSH_DELAY_SECONDS = 0.5
+# Clean records beyond this many are dropped from memory and reloaded on demand
+FSM_CACHE_SIZE = 10_000
+
+
+@dataclass(slots=True)
+class FSMRecord:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage kept in memory and written behind to the fsm_storage table.
+
+    The database is read only for a key this process has not seen yet. Writes mark the
+    key dirty and a flush shortly after persists every dirty key in one transaction, so
+    the set_state/update_data calls of a dialog step cost a single coalesced write.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        flush_delay: float = FSM_FLUSH_DELAY_SECONDS,
+        cache_size: int = FSM_CACHE_SIZE,
+        key_builder: KeyBuilder | None = None,
+    ):
+        self.db = db
+        self.flush_delay = flush_delay
+        self.cache_size = cache_size
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._records: dict[str, FSMRecord] = {}
+        self._dirty: set[str] = set()
+        # Keys taken out of _dirty by a flush that has not committed yet
+        self._flushing: set[str] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self.loads = 0
+        self.flushes = 0
+        self.rows_written = 0
+        db.add_change_listener(self._on_db_change)
+
+    def _on_db_change(self, topic: str) -> None:
+        # Another instance wrote FSM state: keep only our unflushed or still flushing records
+        if topic == TOPIC_FSM:
+            self._records = {name: self._records[name] for name in self._dirty | self._flushing}
+
+    async def _record(self, key: StorageKey) -> tuple[str, FSMRecord]:
+        await self.db.check_changes()
+        name = self.key_builder.build(key)
+        record = self._records.get(name)
+        if record is not None:
+            return name, record
+
+        row = await self.db.get_fsm_record(name)
+        self.loads += 1
+        # Another call may have loaded or changed the key while we were reading it
+        record = self._records.get(name)
+        if record is None:
+            record = FSMRecord(row["state"], json_loads(row["data"])) if row else FSMRecord()
+            self._evict()
+            self._records[name] = record
+        return name, record
+
+    def _evict(self) -> None:
+        if len(self._records) < self.cache_size:
+            return
+        pinned = self._dirty | self._flushing
+        for name in [name for name in self._records if name not in pinned]:
+            del self._records[name]
+            if len(self._records) < self.cache_size // 2:
+                break
+
+    def _mark_dirty(self, name: str) -> None:
+        self._dirty.add(name)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later(), name="fsm-storage-flush")
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        try:
+            await self.flush()
+        except Exception:
+            logging.exception("FSM storage flush failed, will retry on the next change")
+
+    async def flush(self) -> int:
+        """Write every dirty key now; returns the number of keys written."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            names, self._dirty = self._dirty, set()
+            self._flushing = names
+            upserts: list[tuple[str, str | None, str]] = []
+            deletes: list[str] = []
+            for name in names:
+                record = self._records[name]
+                if record.state is None and not record.data:
+                    deletes.append(name)
+                else:
+                    upserts.append((name, record.state, json.dumps(record.data, ensure_ascii=False)))
+            try:
+                await self.db.save_fsm_records(upserts, deletes)
+            except BaseException:
+                self._dirty |= names
+                raise
+            finally:
+                self._flushing = set()
+            self.flushes += 1
+            self.rows_written += len(names)
+            return len(names)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        name, record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(name)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        _, record = await self._record(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        name, record = await self._record(key)
+        record.data = dict(data)
+        self._mark_dirty(name)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, record = await self._record(key)
+        return record.data.copy()
+
+    async def close(self) -> None:
+        """Write every dirty key and forget the clean ones.
+
+        The storage stays usable: the bot worker's dispatcher closes it whenever polling
+        stops on a leader change and polls with it again once re-elected.
+        """
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+        await self.flush()
+        self._records = {name: self._records[name] for name in self._dirty}
@@ -7,7 +7,7 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
 
 from ..keyboards import admin_keyboard, back_keyboard, day_inline_keyboard, user_main_keyboard, yes_no_keyboard
-from ..texts import ACCESS_DENIED, ADMIN_TEXT
+from ..texts import ACCESS_DENIED, ADMIN_TEXT, BOUNCE_REASONS_RU, NO_BOUNCES_TEXT
 from ..utils import is_valid_day, is_valid_lesson_number, is_valid_time
 
 admin_router = Router(name="admin")
@@ -358,3 +358,25 @@ async def setbells_end(message: Message, state: FSMContext, db) -> None:
     )
     await state.clear()
     await message.answer("Звонок сохранен ✅", reply_markup=admin_keyboard())
+
+
+@admin_router.message(Command("bounces"))
+@admin_router.message(F.text == "📵 Недоставленные")
+async def cmd_bounces(message: Message, settings, db) -> None:
+    if not await _require_admin(message, settings):
+        return
+
+    counts = await db.get_reminder_bounce_counts()
+    if not counts:
+        await message.answer(NO_BOUNCES_TEXT, reply_markup=admin_keyboard())
+        return
+
+    lines = ["Недоставленные напоминания:"]
+    for reason, (users, disabled) in counts.items():
+        lines.append(f"{BOUNCE_REASONS_RU.get(reason, reason)}: {users} (отключено: {disabled})")
+    lines.append("")
+    lines.append("Чаще всего:")
+    for bounce in await db.get_reminder_bounces(limit=10):
+        disabled_text = ", напоминания отключены" if bounce.disabled else ""
+        lines.append(f"{bounce.user_id} - подряд: {bounce.bounces}{disabled_text}")
+    await message.answer("\n".join(lines), reply_markup=admin_keyboard())
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from aiogram import F, Router
 from aiogram.filters import Command
+from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, Message
 
 from ..keyboards import day_inline_keyboard, user_main_keyboard
@@ -17,31 +18,33 @@ async def cmd_start(message: Message) -> None:
     await message.answer(START_TEXT, reply_markup=user_main_keyboard())
 
 
+# Read-only commands return the SendMessage instead of awaiting it: over a webhook the
+# method goes back in the HTTP response, in polling the dispatcher sends it.
 @user_router.message(Command("help"))
-async def cmd_help(message: Message) -> None:
-    await message.answer(HELP_TEXT)
+async def cmd_help(message: Message) -> SendMessage:
+    return message.answer(HELP_TEXT)
 
 
 @user_router.message(Command("today"))
-async def cmd_today(message: Message, schedule_service: ScheduleService, settings) -> None:
+async def cmd_today(message: Message, schedule_service: ScheduleService, settings) -> SendMessage:
     now_dt = now_in_timezone(settings.timezone)
     day = day_of_week_monday_first(now_dt)
     text = await schedule_service.format_day_schedule(day)
-    await message.answer(text)
+    return message.answer(text)
 
 
 @user_router.message(Command("tomorrow"))
-async def cmd_tomorrow(message: Message, schedule_service: ScheduleService, settings) -> None:
+async def cmd_tomorrow(message: Message, schedule_service: ScheduleService, settings) -> SendMessage:
     dt = tomorrow(now_in_timezone(settings.timezone))
     day = day_of_week_monday_first(dt)
     text = await schedule_service.format_day_schedule(day)
-    await message.answer(text)
+    return message.answer(text)
 
 
 @user_router.message(Command("week"))
-async def cmd_week(message: Message, schedule_service: ScheduleService) -> None:
+async def cmd_week(message: Message, schedule_service: ScheduleService) -> SendMessage:
     text = await schedule_service.format_week_schedule()
-    await message.answer(text)
+    return message.answer(text)
 
 
 @user_router.message(Command("day"))
@@ -58,8 +61,8 @@ async def callback_user_day(query: CallbackQuery, schedule_service: ScheduleServ
 
 
 @user_router.message(Command("bell"))
-async def cmd_bell(message: Message, schedule_service: ScheduleService) -> None:
-    await message.answer(await schedule_service.format_bells())
+async def cmd_bell(message: Message, schedule_service: ScheduleService) -> SendMessage:
+    return message.answer(await schedule_service.format_bells())
 
 
 @user_router.message(Command("remind_on"))
@@ -91,17 +94,17 @@ async def cmd_remind_time(message: Message, db) -> None:
 
 
 @user_router.message(F.text == "📅 Сегодня")
-async def button_today(message: Message, schedule_service: ScheduleService, settings) -> None:
+async def button_today(message: Message, schedule_service: ScheduleService, settings) -> SendMessage:
     now_dt = now_in_timezone(settings.timezone)
     text = await schedule_service.format_day_schedule(day_of_week_monday_first(now_dt))
-    await message.answer(text)
+    return message.answer(text)
 
 
 @user_router.message(F.text == "➡️ Завтра")
-async def button_tomorrow(message: Message, schedule_service: ScheduleService, settings) -> None:
+async def button_tomorrow(message: Message, schedule_service: ScheduleService, settings) -> SendMessage:
     dt = tomorrow(now_in_timezone(settings.timezone))
     text = await schedule_service.format_day_schedule(day_of_week_monday_first(dt))
-    await message.answer(text)
+    return message.answer(text)
 
 
 @user_router.message(F.text == "🗓 Выбрать день")
@@ -110,15 +113,15 @@ async def button_day(message: Message) -> None:
 
 
 @user_router.message(F.text == "📘 Неделя")
-async def button_week(message: Message, schedule_service: ScheduleService) -> None:
-    await message.answer(await schedule_service.format_week_schedule())
+async def button_week(message: Message, schedule_service: ScheduleService) -> SendMessage:
+    return message.answer(await schedule_service.format_week_schedule())
 
 
 @user_router.message(F.text == "⏰ Звонки")
-async def button_bell(message: Message, schedule_service: ScheduleService) -> None:
-    await message.answer(await schedule_service.format_bells())
+async def button_bell(message: Message, schedule_service: ScheduleService) -> SendMessage:
+    return message.answer(await schedule_service.format_bells())
 
 
 @user_router.message(F.text == "ℹ️ Помощь")
-async def button_help(message: Message) -> None:
-    await message.answer(HELP_TEXT)
+async def button_help(message: Message) -> SendMessage:
+    return message.answer(HELP_TEXT)
@@ -19,6 +19,7 @@ def admin_keyboard() -> ReplyKeyboardMarkup:
         keyboard=[
             [KeyboardButton(text="➕ Добавить/изменить урок"), KeyboardButton(text="➖ Удалить урок")],
             [KeyboardButton(text="📄 Список на день"), KeyboardButton(text="⏰ Настроить звонки")],
+            [KeyboardButton(text="📵 Недоставленные")],
             [KeyboardButton(text="⬅️ Назад"), KeyboardButton(text="🏠 Главное меню")],
         ],
         resize_keyboard=True,
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import signal
+from contextlib import suppress
 
 from aiogram import Bot, Dispatcher
 
 from .app import create_dispatcher, setup_logging
 from .config import Settings, load_settings
 from .db import Database
+from .services.leader_service import LeaderElection
 from .services.reminder_service import ReminderService
 from .services.schedule_service import ScheduleService
 
@@ -19,23 +23,75 @@ async def run_bot() -> None:
     await db.init()
 
     bot = Bot(token=settings.bot_token)
-    dp: Dispatcher = create_dispatcher()
+    dp: Dispatcher = create_dispatcher(db)
 
     schedule_service = ScheduleService(db)
-    reminder_service = ReminderService(bot=bot, db=db, timezone=settings.timezone)
+    reminder_service = ReminderService(bot=bot, db=db, timezone=settings.timezone, event_driven=True)
 
-    reminder_service.start()
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):  # no loop signal handlers on Windows
+            loop.add_signal_handler(signum, stopped.set)
 
-    try:
-        await dp.start_polling(
-            bot,
-            settings=settings,
-            db=db,
-            schedule_service=schedule_service,
+    polling: asyncio.Task | None = None
+    polling_error: BaseException | None = None
+
+    def on_polling_done(task: asyncio.Task) -> None:
+        nonlocal polling_error
+        if not task.cancelled() and task.exception() is not None:
+            # Polling only ends by itself on an error: exit so the platform restarts the worker
+            polling_error = task.exception()
+            logging.error("Polling failed", exc_info=polling_error)
+            stopped.set()
+
+    def start_serving() -> None:
+        nonlocal polling
+        polling = asyncio.create_task(
+            dp.start_polling(
+                bot,
+                allowed_updates=dp.resolve_used_update_types(),
+                handle_signals=False,
+                close_bot_session=False,
+                settings=settings,
+                db=db,
+                schedule_service=schedule_service,
+            ),
+            name="polling",
         )
+        polling.add_done_callback(on_polling_done)
+        reminder_service.start()
+
+    async def stop_serving() -> None:
+        try:
+            if polling is not None and not polling.done():
+                try:
+                    await dp.stop_polling()
+                except RuntimeError:
+                    # Demoted before the polling task got to start
+                    polling.cancel()
+                await asyncio.gather(polling, return_exceptions=True)
+        finally:
+            await reminder_service.stop()
+
+    # Telegram allows one getUpdates consumer per bot token, so only the lease holder polls
+    # and runs the reminder loop; other replicas wait on standby and take over the lease
+    worker_leader = LeaderElection(
+        db,
+        name="bot-worker",
+        on_elected=start_serving,
+        on_demoted=stop_serving,
+    )
+    worker_leader.start()
+
+    try:
+        await stopped.wait()
     finally:
-        await reminder_service.stop()
+        await worker_leader.stop()
         await bot.session.close()
+        await db.close()
+    if polling_error is not None:
+        raise polling_error
 
 
 def main() -> None:
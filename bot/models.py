@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+
+# Row types returned by Database. Each from_row is an sqlite3 row factory, so rows are
+# built straight from the fetched tuple: columns must be selected in field order.
+
+
+@dataclass(slots=True, frozen=True)
+class ScheduleItem:
+    id: int
+    day_of_week: int
+    lesson_number: int
+    subject: str
+    room: str | None
+    teacher: str | None
+    start_time: str | None
+    end_time: str | None
+    is_online: bool
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> ScheduleItem:
+        return cls(*row[:8], bool(row[8]))
+
+
+@dataclass(slots=True, frozen=True)
+class BellTime:
+    lesson_number: int
+    start_time: str
+    end_time: str
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> BellTime:
+        return cls(*row)
+
+
+@dataclass(slots=True, frozen=True)
+class UserSettings:
+    user_id: int
+    reminders_enabled: bool
+    reminder_minutes: int
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> UserSettings:
+        return cls(row[0], bool(row[1]), row[2])
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxEntry:
+    id: int
+    date_key: str
+    user_id: int
+    day_of_week: int
+    lesson_number: int
+    reminder_minutes: int
+    fire_at: float
+    expires_at: float
+    text: str
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> OutboxEntry:
+        return cls(*row)
+
+
+@dataclass(slots=True, frozen=True)
+class ReminderBounce:
+    user_id: int
+    reason: str
+    bounces: int
+    last_bounce_at: str
+    disabled: bool
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> ReminderBounce:
+        return cls(*row[:4], row[4] is not None)
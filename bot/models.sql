@@ -19,6 +19,10 @@ CREATE TABLE IF NOT EXISTS user_settings (
     reminder_minutes INTEGER NOT NULL DEFAULT 10 CHECK (reminder_minutes BETWEEN 5 AND 60)
 );
 
+-- Only enabled subscribers; user_id is the rowid, so entries are ordered by (reminder_minutes, user_id)
+CREATE INDEX IF NOT EXISTS idx_user_settings_subscribers ON user_settings(reminder_minutes)
+    WHERE reminders_enabled = 1;
+
 CREATE TABLE IF NOT EXISTS bell_times (
     lesson_number INTEGER PRIMARY KEY CHECK (lesson_number BETWEEN 1 AND 10),
     start_time TEXT NOT NULL,
@@ -33,7 +37,60 @@ CREATE TABLE IF NOT EXISTS reminder_log (
     lesson_number INTEGER NOT NULL,
     reminder_minutes INTEGER NOT NULL,
     sent_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'delivered',
     UNIQUE(date_key, user_id, day_of_week, lesson_number, reminder_minutes)
 );
 
 CREATE INDEX IF NOT EXISTS idx_reminder_log_date ON reminder_log(date_key);
+
+CREATE TABLE IF NOT EXISTS reminder_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date_key TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    lesson_number INTEGER NOT NULL,
+    reminder_minutes INTEGER NOT NULL,
+    fire_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    UNIQUE(date_key, user_id, day_of_week, lesson_number, reminder_minutes)
+);
+
+CREATE INDEX IF NOT EXISTS idx_reminder_outbox_due ON reminder_outbox(status, fire_at);
+CREATE INDEX IF NOT EXISTS idx_reminder_outbox_user ON reminder_outbox(user_id, date_key);
+
+-- Lessons of the day in meta.reminder_outbox_date, so a settings change can add one user's rows
+CREATE TABLE IF NOT EXISTS reminder_outbox_lessons (
+    day_of_week INTEGER NOT NULL,
+    lesson_number INTEGER NOT NULL,
+    starts_at REAL NOT NULL,
+    text_template TEXT NOT NULL,
+    PRIMARY KEY (day_of_week, lesson_number)
+);
+
+-- Consecutive undeliverable reminders per user; reset by a delivery or /remind_on
+CREATE TABLE IF NOT EXISTS reminder_bounces (
+    user_id INTEGER PRIMARY KEY,
+    reason TEXT NOT NULL,
+    bounces INTEGER NOT NULL DEFAULT 0,
+    last_bounce_at TEXT NOT NULL,
+    disabled_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fsm_storage (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL DEFAULT '{}'
+);
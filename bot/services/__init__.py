@@ -1,4 +1,5 @@
+from .leader_service import LeaderElection
 from .reminder_service import ReminderService
 from .schedule_service import ScheduleService
 
-__all__ = ["ScheduleService", "ReminderService"]
+__all__ = ["ScheduleService", "ReminderService", "LeaderElection"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from ..db import Database
+
+LEASE_TTL_SECONDS = 15.0
+LEASE_HEARTBEAT_SECONDS = 5.0
+
+
+class LeaderElection:
+    """Keeps one process per database running `on_elected` work via a lease row in SQLite."""
+
+    def __init__(
+        self,
+        db: Database,
+        name: str,
+        on_elected: Callable[[], Awaitable[None] | None],
+        on_demoted: Callable[[], Awaitable[None] | None],
+        ttl_seconds: float = LEASE_TTL_SECONDS,
+        heartbeat_seconds: float = LEASE_HEARTBEAT_SECONDS,
+    ):
+        self.db = db
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._renewed_at = 0.0
+        self._task: asyncio.Task | None = None
+        self._stopped = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run(), name=f"leader-{self.name}")
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        try:
+            if self._task:
+                await self._task
+            if self.is_leader:
+                await self._demote("shutdown")
+        finally:
+            try:
+                await self.db.release_lease(self.name, self.holder)
+            except Exception:  # pragma: no cover - defensive
+                logging.exception("Failed to release lease %s", self.name)
+
+    async def _run(self) -> None:
+        logging.info("Leader election started for %s as %s", self.name, self.holder)
+        while not self._stopped.is_set():
+            try:
+                acquired = await self.db.acquire_lease(self.name, self.holder, self.ttl_seconds)
+            except Exception as exc:
+                logging.warning("Lease %s heartbeat failed: %s", self.name, exc)
+                acquired = None
+
+            if acquired:
+                self._renewed_at = time.monotonic()
+                if not self.is_leader:
+                    await self._elect()
+            elif self.is_leader and (
+                acquired is False or time.monotonic() - self._renewed_at >= self.ttl_seconds
+            ):
+                # Either someone else holds the lease or we could not renew it before it expired
+                await self._demote("lease lost")
+
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.heartbeat_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _elect(self) -> None:
+        self.is_leader = True
+        logging.info("Became leader for %s", self.name)
+        try:
+            await _maybe_await(self.on_elected())
+        except Exception:
+            # Keep heartbeating: the lease is still ours and the next term may work
+            logging.exception("on_elected failed for %s", self.name)
+
+    async def _demote(self, reason: str) -> None:
+        self.is_leader = False
+        logging.info("Stepped down as leader for %s (%s)", self.name, reason)
+        try:
+            await _maybe_await(self.on_demoted())
+        except Exception:
+            logging.exception("on_demoted failed for %s", self.name)
+
+
+async def _maybe_await(result: Awaitable[None] | None) -> None:
+    if result is not None:
+        await result
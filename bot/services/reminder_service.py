@@ -1,48 +1,355 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
-from datetime import timedelta
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 
 from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
 
-from ..db import Database
+from ..db import (
+    META_REMINDER_OUTBOX_DATE,
+    OUTBOX_DONE,
+    OUTBOX_EXPIRED,
+    OUTBOX_MINUTES_PLACEHOLDER,
+    REMINDER_DELIVERED,
+    REMINDER_FAILED,
+    TOPIC_FSM,
+    Database,
+)
+from ..models import ScheduleItem
 from ..utils import day_of_week_monday_first, now_in_timezone, parse_time_to_datetime
 
+# Send within a 59-second window for resilience
+REMINDER_WINDOW_SECONDS = 59
+
+# Telegram allows about 30 messages per second to different chats
+SEND_RATE_PER_SECOND = 30.0
+SEND_WORKERS = 8
+SEND_QUEUE_SIZE = 256
+SEND_MAX_ATTEMPTS = 4
+SEND_BACKOFF_SECONDS = 0.5
+SEND_BACKOFF_MAX_SECONDS = 8.0
+
+OUTBOX_BATCH_SIZE = 500
+# The event-driven loop wakes at least this often to look for edits made by other instances
+CHANGE_POLL_SECONDS = 5.0
+
+# Why a recipient cannot receive messages at all (reminder_bounces.reason)
+BOUNCE_BLOCKED = "blocked"
+BOUNCE_DEACTIVATED = "deactivated"
+BOUNCE_CHAT_NOT_FOUND = "chat_not_found"
+# Consecutive bounces after which a user's reminders are turned off
+BOUNCE_DISABLE_THRESHOLD = 3
+
+
+def bounce_reason(exc: Exception) -> str | None:
+    """Classify a send error that will fail the same way on every retry, else None."""
+    message = str(getattr(exc, "message", "")).lower()
+    if isinstance(exc, TelegramForbiddenError):
+        return BOUNCE_DEACTIVATED if "deactivated" in message else BOUNCE_BLOCKED
+    if isinstance(exc, TelegramBadRequest):
+        if "chat not found" in message:
+            return BOUNCE_CHAT_NOT_FOUND
+        if "deactivated" in message:
+            return BOUNCE_DEACTIVATED
+    return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Block every sender for `seconds`, e.g. after a flood-control response."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(slots=True)
+class ReminderJob:
+    user_id: int
+    day_of_week: int
+    lesson_number: int
+    reminder_minutes: int
+    text: str
+
+    @property
+    def key(self) -> tuple[int, int, int, int]:
+        return (self.user_id, self.day_of_week, self.lesson_number, self.reminder_minutes)
+
+
+@dataclass(slots=True)
+class SendReport:
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    max_queue_depth: int = 0
+    elapsed: float = 0.0
+    delivered: list[ReminderJob] = field(default_factory=list)
+    undelivered: list[ReminderJob] = field(default_factory=list)
+    # (user_id, reason) of undelivered jobs whose recipient is unreachable
+    bounced: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def merge(self, other: SendReport) -> SendReport:
+        self.sent += other.sent
+        self.failed += other.failed
+        self.retried += other.retried
+        self.max_queue_depth = max(self.max_queue_depth, other.max_queue_depth)
+        self.elapsed += other.elapsed
+        self.delivered.extend(other.delivered)
+        self.undelivered.extend(other.undelivered)
+        self.bounced.extend(other.bounced)
+        return self
+
+
+class SendPipeline:
+    def __init__(
+        self,
+        bot: Bot,
+        rate_per_second: float = SEND_RATE_PER_SECOND,
+        workers: int = SEND_WORKERS,
+        queue_size: int = SEND_QUEUE_SIZE,
+        max_attempts: int = SEND_MAX_ATTEMPTS,
+    ):
+        self.bot = bot
+        self.bucket = TokenBucket(rate_per_second)
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+
+    async def run(
+        self,
+        jobs: Iterable[ReminderJob] | AsyncIterable[ReminderJob],
+        report: SendReport | None = None,
+    ) -> SendReport:
+        """Send jobs through the worker pool; an async source is consumed as the queue drains."""
+        report = report if report is not None else SendReport()
+        started = time.perf_counter()
+        queue: asyncio.Queue[ReminderJob] = asyncio.Queue(maxsize=self.queue_size)
+        workers = [
+            asyncio.create_task(self._worker(queue, report), name=f"reminder-sender-{index}")
+            for index in range(self.workers)
+        ]
+        try:
+            if isinstance(jobs, AsyncIterable):
+                async for job in jobs:
+                    await queue.put(job)
+                    report.max_queue_depth = max(report.max_queue_depth, queue.qsize())
+            else:
+                for job in jobs:
+                    await queue.put(job)
+                    report.max_queue_depth = max(report.max_queue_depth, queue.qsize())
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    async def _worker(self, queue: asyncio.Queue[ReminderJob], report: SendReport) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                if await self._send(job, report):
+                    report.sent += 1
+                    report.delivered.append(job)
+                else:
+                    report.failed += 1
+                    report.undelivered.append(job)
+            except Exception:  # pragma: no cover - defensive
+                report.failed += 1
+                report.undelivered.append(job)
+                logging.exception("Failed to send reminder to %s", job.user_id)
+            finally:
+                queue.task_done()
+
+    async def _send(self, job: ReminderJob, report: SendReport) -> bool:
+        for attempt in range(1, self.max_attempts + 1):
+            await self.bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=job.user_id, text=job.text)
+                return True
+            except TelegramRetryAfter as exc:
+                logging.warning("Flood control, pausing sends for %ss", exc.retry_after)
+                self.bucket.pause(exc.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as exc:
+                if attempt == self.max_attempts:
+                    break
+                delay = min(SEND_BACKOFF_SECONDS * 2 ** (attempt - 1), SEND_BACKOFF_MAX_SECONDS)
+                logging.warning("Transient error sending to %s (%s), retry in %.1fs", job.user_id, exc, delay)
+                await asyncio.sleep(delay)
+            except (TelegramForbiddenError, TelegramBadRequest) as exc:
+                reason = bounce_reason(exc)
+                if reason is None:
+                    logging.exception("Failed to send reminder to %s", job.user_id)
+                else:
+                    logging.info("Reminder to %s bounced (%s): %s", job.user_id, reason, exc.message)
+                    report.bounced.append((job.user_id, reason))
+                return False
+            except Exception:
+                logging.exception("Failed to send reminder to %s", job.user_id)
+                return False
+            report.retried += 1
+        logging.error("Giving up on reminder to %s after %s attempts", job.user_id, self.max_attempts)
+        return False
+
 
 class ReminderService:
-    def __init__(self, bot: Bot, db: Database, timezone, poll_seconds: int = 30):
+    def __init__(
+        self,
+        bot: Bot,
+        db: Database,
+        timezone,
+        poll_seconds: int = 30,
+        event_driven: bool = False,
+        send_rate_per_second: float = SEND_RATE_PER_SECOND,
+    ):
         self.bot = bot
         self.db = db
         self.timezone = timezone
         self.poll_seconds = poll_seconds
+        self.event_driven = event_driven
         self._task: asyncio.Task | None = None
         self._stopped = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        # (fire_at, day_of_week, lesson_number, reminder_minutes) for the current day
+        self._heap: list[tuple[datetime, int, int, int]] = []
+        self._heap_lessons: dict[int, ScheduleItem] = {}
+        self._heap_date_key: str | None = None
+        self._heap_dirty = True
+        # (lesson_number, reminder_minutes) heap entries already fired on _fired_date_key, so a
+        # rebuild inside the delivery window does not claim the whole bucket again; per-user
+        # duplicates are prevented by Database.claim_reminders
+        self._fired: set[tuple[int, int]] = set()
+        self._fired_date_key: str | None = None
+        self.pipeline = SendPipeline(bot, rate_per_second=send_rate_per_second)
+        self.ticks_total = 0
+        self.ticks_skipped = 0
+        # Claimed reminder_log rows whose final status has not been committed yet
+        self._pending_log: dict[str, list[tuple[str, int, int, int, int]]] = {
+            REMINDER_DELIVERED: [],
+            REMINDER_FAILED: [],
+        }
+        self._pending_bounces: list[tuple[int, str]] = []
+        self.bounce_threshold = BOUNCE_DISABLE_THRESHOLD
 
     def start(self) -> None:
         if self._task and not self._task.done():
             return
         self._stopped.clear()
+        self._heap_dirty = True
+        self.db.add_change_listener(self._on_db_change)
         self._task = asyncio.create_task(self._run(), name="reminder-service")
 
     async def stop(self) -> None:
         self._stopped.set()
+        self._wakeup.set()
+        self.db.remove_change_listener(self._on_db_change)
         if self._task:
             await self._task
+        await self.flush_reminder_log()
+
+    async def flush_reminder_log(self) -> None:
+        for status, pending in self._pending_log.items():
+            if not pending:
+                continue
+            rows = list(pending)
+            pending.clear()
+            try:
+                await self.db.set_reminders_status(rows, status)
+            except Exception:
+                # Keep the rows so the next tick retries the commit
+                pending[:0] = rows
+                raise
+
+        if self._pending_bounces:
+            bounces, self._pending_bounces = self._pending_bounces, []
+            try:
+                disabled = await self.db.record_reminder_bounces(bounces, self.bounce_threshold)
+            except Exception:
+                self._pending_bounces[:0] = bounces
+                raise
+            if disabled:
+                logging.info("Reminders disabled for %s unreachable users", len(disabled))
+
+    def _on_db_change(self, topic: str) -> None:
+        # Only schedule, bell and settings writes change what the heap holds
+        if topic == TOPIC_FSM:
+            return
+        self._heap_dirty = True
+        self._wakeup.set()
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
 
     async def _run(self) -> None:
-        logging.info("Reminder service started")
+        logging.info("Reminder service started (event_driven=%s)", self.event_driven)
         while not self._stopped.is_set():
+            self._wakeup.clear()
             try:
-                await self.check_once()
+                if self.event_driven:
+                    await self.db.check_changes()
+                    delay = min(await self._run_due(), CHANGE_POLL_SECONDS)
+                else:
+                    await self.check_once()
+                    delay = self.poll_seconds
             except Exception as exc:  # pragma: no cover - defensive
                 logging.exception("Reminder loop error: %s", exc)
-            await asyncio.sleep(self.poll_seconds)
+                delay = self.poll_seconds
+            if self._stopped.is_set():
+                break
+            await self._sleep(delay)
         logging.info("Reminder service stopped")
 
-    async def check_once(self) -> None:
-        now_dt = now_in_timezone(self.timezone)
-        # 1..5 are school days by default
+    async def _rebuild_heap(self, now_dt: datetime) -> None:
+        self._heap_dirty = False
+        self._heap = []
+        self._heap_lessons = {}
+        self._heap_date_key = now_dt.strftime("%Y-%m-%d")
+        if self._fired_date_key != self._heap_date_key:
+            self._fired = set()
+            self._fired_date_key = self._heap_date_key
+            # Once per day, not on every rebuild a settings change triggers
+            await self.db.cleanup_old_reminder_log(keep_days=14)
+
         day_of_week = day_of_week_monday_first(now_dt)
         if day_of_week > 5:
             return
@@ -50,57 +357,281 @@ class ReminderService:
         schedule = await self.db.get_schedule_for_day(day_of_week)
         if not schedule:
             return
-
-        subscribers = await self.db.get_reminder_subscribers()
-        if not subscribers:
+        buckets = await self.db.get_reminder_buckets()
+        if not buckets:
             return
 
+        for item in schedule:
+            lesson_start = self._lesson_start(item, now_dt)
+            if lesson_start is None:
+                continue
+            lesson_number = item.lesson_number
+            self._heap_lessons[lesson_number] = item
+            for minutes in buckets:
+                fire_at = lesson_start - timedelta(minutes=minutes)
+                if (lesson_number, minutes) in self._fired:
+                    continue
+                if (now_dt - fire_at).total_seconds() < REMINDER_WINDOW_SECONDS:
+                    self._heap.append((fire_at, day_of_week, lesson_number, minutes))
+        heapq.heapify(self._heap)
+        logging.info("Reminder heap rebuilt: %s entries for %s", len(self._heap), self._heap_date_key)
+
+    async def _run_due(self) -> float:
+        """Fire every heap entry that is due and return seconds until the next one."""
+        now_dt = now_in_timezone(self.timezone)
+        if self._heap_dirty or self._heap_date_key != now_dt.strftime("%Y-%m-%d"):
+            await self._rebuild_heap(now_dt)
+
+        due: list[tuple[ScheduleItem, int]] = []
+        while self._heap and self._heap[0][0] <= now_dt:
+            fire_at, day_of_week, lesson_number, minutes = heapq.heappop(self._heap)
+            if (now_dt - fire_at).total_seconds() >= REMINDER_WINDOW_SECONDS:
+                continue
+            self._fired.add((lesson_number, minutes))
+            due.append((self._heap_lessons[lesson_number], minutes))
+        if due:
+            await self._deliver_lessons(due, self._heap_date_key)
+            now_dt = now_in_timezone(self.timezone)
+
+        next_midnight = (now_dt + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        next_wake = min(self._heap[0][0], next_midnight) if self._heap else next_midnight
+        return (next_wake - now_dt).total_seconds()
+
+    def _lesson_start(self, item: ScheduleItem, now_dt: datetime) -> datetime | None:
+        # start_time already falls back to bell_times in Database.get_schedule_for_day
+        if not item.start_time:
+            return None
+        return parse_time_to_datetime(now_dt, item.start_time, self.timezone)
+
+    @staticmethod
+    def _reminder_template(item: ScheduleItem) -> str:
+        room_text = "онлайн" if item.is_online else f"каб. {item.room or '—'}"
+        return f"Через {OUTBOX_MINUTES_PLACEHOLDER} минут: {item.subject}, {room_text} ⏰"
+
+    @classmethod
+    def _reminder_text(cls, item: ScheduleItem, minutes: int) -> str:
+        # Same substitution as the outbox does in SQL with replace()
+        return cls._reminder_template(item).replace(OUTBOX_MINUTES_PLACEHOLDER, str(minutes))
+
+    def _take_outcomes(self, report: SendReport, date_key: str) -> None:
+        """Move the jobs the pipeline has finished so far into the pending reminder_log updates."""
+        for job in report.delivered:
+            self._pending_log[REMINDER_DELIVERED].append((date_key, *job.key))
+        for job in report.undelivered:
+            self._pending_log[REMINDER_FAILED].append((date_key, *job.key))
+        self._pending_bounces.extend(report.bounced)
+        report.delivered.clear()
+        report.undelivered.clear()
+        report.bounced.clear()
+
+    def _log_delivery(self, report: SendReport, claimed: int, candidates: int) -> None:
+        logging.info(
+            "Reminder tick: claimed=%s/%s sent=%s failed=%s retried=%s max_queue=%s "
+            "elapsed=%.2fs throughput=%.1f msg/s",
+            claimed,
+            candidates,
+            report.sent,
+            report.failed,
+            report.retried,
+            report.max_queue_depth,
+            report.elapsed,
+            report.throughput,
+        )
+
+    async def _stream_jobs(
+        self,
+        lessons: list[tuple[ScheduleItem, int]],
+        date_key: str,
+        report: SendReport,
+        counts: list[int],
+    ) -> AsyncIterator[ReminderJob]:
+        """Claim and yield the reminders of (lesson, reminder_minutes) pairs page by page.
+
+        The pipeline sends a page while the next one is read and claimed, so memory stays
+        at about one page plus the send queue whatever the number of subscribers.
+        """
+        for item, minutes in lessons:
+            text = self._reminder_text(item, minutes)
+            async for user_ids in self.db.iter_reminder_subscribers(minutes):
+                keys = [(user_id, item.day_of_week, item.lesson_number, minutes) for user_id in user_ids]
+                claimed = await self.db.claim_reminders([(date_key, *key) for key in keys])
+                counts[0] += len(keys)
+                counts[1] += len(claimed)
+
+                self._take_outcomes(report, date_key)
+                try:
+                    await self.flush_reminder_log()
+                except Exception:
+                    logging.exception("Could not commit reminder statuses, will retry after the tick")
+
+                for key in keys:
+                    if key in claimed:
+                        yield ReminderJob(*key, text)
+
+    async def _deliver_lessons(
+        self,
+        lessons: list[tuple[ScheduleItem, int]],
+        date_key: str,
+    ) -> SendReport:
+        """Send every subscriber the reminder of each (lesson, reminder_minutes) pair."""
+        report = SendReport()
+        counts = [0, 0]
+        await self.pipeline.run(self._stream_jobs(lessons, date_key, report, counts), report)
+        self._take_outcomes(report, date_key)
+        await self.flush_reminder_log()
+        self._log_delivery(report, counts[1], counts[0])
+        return report
+
+    async def _deliver(
+        self,
+        jobs: list[ReminderJob],
+        date_key: str,
+    ) -> SendReport:
+        # Claim before sending: a concurrent tick or process that already logged a
+        # reminder makes the INSERT a no-op, so each reminder goes out at most once.
+        claimed = await self.db.claim_reminders([(date_key, *job.key) for job in jobs])
+        claimed_jobs = [job for job in jobs if job.key in claimed]
+
+        report = await self.pipeline.run(claimed_jobs)
+        self._take_outcomes(report, date_key)
+        await self.flush_reminder_log()
+        self._log_delivery(report, len(claimed_jobs), len(jobs))
+        return report
+
+    async def tick(self, shard: int = 0, shards: int = 1, budget: int | None = None) -> SendReport | None:
+        """One cron tick: drain due rows of this shard from reminder_outbox.
+
+        Until next_due_at the tick returns after a single meta read, without touching
+        the schedule or outbox tables.
+        """
+        if not await self.prepare_tick():
+            return None
+        report = await self.process_outbox(shard=shard, shards=shards, budget=budget)
+        await self.update_next_due_at()
+        return report
+
+    async def prepare_tick(self) -> bool:
+        """Return False when nothing is due yet; otherwise make sure today's outbox exists."""
+        self.ticks_total += 1
+        next_due_at = await self.db.get_reminder_next_due_at()
+        if next_due_at is not None and time.time() < next_due_at:
+            self.ticks_skipped += 1
+            return False
+
+        now_dt = now_in_timezone(self.timezone)
+        if await self.db.get_meta(META_REMINDER_OUTBOX_DATE) != now_dt.strftime("%Y-%m-%d"):
+            await self.materialize_outbox(now_dt)
+        return True
+
+    async def update_next_due_at(self) -> None:
+        now_dt = now_in_timezone(self.timezone)
+        next_midnight = (now_dt + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        next_due = next_midnight.timestamp()
+        next_fire_at = await self.db.get_outbox_next_fire_at()
+        if next_fire_at is not None:
+            next_due = min(next_due, next_fire_at)
+        await self.db.set_reminder_next_due_at(next_due)
+        logging.info(
+            "Reminder tick ran, next due at %s (skipped %s of %s ticks)",
+            datetime.fromtimestamp(next_due, self.timezone).isoformat(),
+            self.ticks_skipped,
+            self.ticks_total,
+        )
+
+    async def materialize_outbox(self, now_dt: datetime) -> int:
+        """Write today's pending reminders into reminder_outbox, one row per recipient."""
         date_key = now_dt.strftime("%Y-%m-%d")
+        lessons: list[tuple[int, int, float, str]] = []
+        day_of_week = day_of_week_monday_first(now_dt)
+        if day_of_week <= 5:
+            for item in await self.db.get_schedule_for_day(day_of_week):
+                lesson_start = self._lesson_start(item, now_dt)
+                if lesson_start is not None:
+                    template = self._reminder_template(item)
+                    lessons.append((day_of_week, item.lesson_number, lesson_start.timestamp(), template))
+
+        # Lessons that already started are left out in SQL
+        inserted = await self.db.replace_pending_outbox(date_key, lessons, now_dt.timestamp())
+        await self.db.cleanup_old_reminder_log(keep_days=14)
+        logging.info("Reminder outbox materialized: %s rows for %s", inserted, date_key)
+        return inserted
+
+    async def process_outbox(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        shard: int = 0,
+        shards: int = 1,
+        budget: int | None = None,
+    ) -> SendReport | None:
+        """Send every due outbox row, including ones missed by late or skipped ticks.
+
+        With shards > 1 only recipients with user_id % shards == shard are handled, and at
+        most `budget` rows are taken per call; the rest stay pending for the next tick.
+        """
+        total: SendReport | None = None
+        remaining = budget
+        while remaining is None or remaining > 0:
+            now_ts = time.time()
+            limit = batch_size if remaining is None else min(batch_size, remaining)
+            rows = await self.db.get_due_outbox(now_ts, limit, shard=shard, shards=shards)
+            if not rows:
+                break
+            if remaining is not None:
+                remaining -= len(rows)
+
+            expired = [row.id for row in rows if row.expires_at <= now_ts]
+            if expired:
+                await self.db.set_outbox_status(expired, OUTBOX_EXPIRED)
+                logging.info("Reminder outbox: %s rows expired before delivery", len(expired))
+
+            by_date: dict[str, list[ReminderJob]] = {}
+            for row in rows:
+                if row.expires_at <= now_ts:
+                    continue
+                job = ReminderJob(
+                    row.user_id, row.day_of_week, row.lesson_number, row.reminder_minutes, row.text
+                )
+                by_date.setdefault(row.date_key, []).append(job)
+
+            for date_key, jobs in by_date.items():
+                report = await self._deliver(jobs, date_key)
+                total = report if total is None else total.merge(report)
+            await self.db.set_outbox_status(
+                [row.id for row in rows if row.expires_at > now_ts], OUTBOX_DONE
+            )
+        return total
+
+    async def check_once(self) -> SendReport | None:
+        now_dt = now_in_timezone(self.timezone)
+        # 1..5 are school days by default
+        day_of_week = day_of_week_monday_first(now_dt)
+        if day_of_week > 5:
+            return None
+
+        schedule = await self.db.get_schedule_for_day(day_of_week)
+        if not schedule:
+            return None
+
+        buckets = await self.db.get_reminder_buckets()
+        if not buckets:
+            return None
+
+        date_key = now_dt.strftime("%Y-%m-%d")
+        due: list[tuple[ScheduleItem, int]] = []
 
         for item in schedule:
-            start_time = item.get("start_time")
-            if not start_time:
-                bell = await self.db.get_bell_time(item["lesson_number"])
-                start_time = bell["start_time"] if bell else None
-            if not start_time:
+            lesson_start = self._lesson_start(item, now_dt)
+            if lesson_start is None:
                 continue
 
-            lesson_start = parse_time_to_datetime(now_dt, start_time, self.timezone)
-
-            for subscriber in subscribers:
-                minutes = int(subscriber.get("reminder_minutes", 10))
+            # One comparison per reminder_minutes bucket instead of one per subscriber
+            for minutes in buckets:
                 remind_time = lesson_start - timedelta(minutes=minutes)
+                if 0 <= (now_dt - remind_time).total_seconds() < REMINDER_WINDOW_SECONDS:
+                    due.append((item, minutes))
 
-                # Send within a 59-second window for resilience
-                if 0 <= (now_dt - remind_time).total_seconds() < 59:
-                    already_sent = await self.db.reminder_already_sent(
-                        date_key=date_key,
-                        user_id=int(subscriber["user_id"]),
-                        day_of_week=int(item["day_of_week"]),
-                        lesson_number=int(item["lesson_number"]),
-                        reminder_minutes=minutes,
-                    )
-                    if already_sent:
-                        continue
-
-                    room = item.get("room") or "—"
-                    room_text = "онлайн" if item.get("is_online") else f"каб. {room}"
-                    text = f"Через {minutes} минут: {item['subject']}, {room_text} ⏰"
-                    try:
-                        await self.bot.send_message(chat_id=subscriber["user_id"], text=text)
-                        await self.db.save_reminder_sent(
-                            date_key=date_key,
-                            user_id=int(subscriber["user_id"]),
-                            day_of_week=int(item["day_of_week"]),
-                            lesson_number=int(item["lesson_number"]),
-                            reminder_minutes=minutes,
-                        )
-                        logging.info(
-                            "Reminder sent user=%s day=%s lesson=%s",
-                            subscriber["user_id"],
-                            item["day_of_week"],
-                            item["lesson_number"],
-                        )
-                    except Exception:
-                        logging.exception("Failed to send reminder to %s", subscriber["user_id"])
+        report = None
+        if due:
+            report = await self._deliver_lessons(due, date_key)
         await self.db.cleanup_old_reminder_log(keep_days=14)
+        return report
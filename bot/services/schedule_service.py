@@ -1,15 +1,57 @@
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+
 from ..db import Database
+from ..models import BellTime, ScheduleItem
 from ..texts import DAYS_RU, EMPTY_DAY_TEXT
 
 
 class ScheduleService:
     def __init__(self, db: Database):
         self.db = db
+        # (kind, day) -> (schedule_version, rendered text)
+        self._cache: dict[tuple[str, int], tuple[int, str]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def cache_stats(self) -> dict[str, int]:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._cache),
+            "version": self.db.schedule_version,
+        }
+
+    async def _cached(self, key: tuple[str, int], render: Callable[[], Awaitable[str]]) -> str:
+        # Picks up edits made through other instances (rate-limited inside Database)
+        await self.db.check_changes()
+        version = self.db.schedule_version
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            self.cache_hits += 1
+            return cached[1]
+
+        self.cache_misses += 1
+        text = await render()
+        self._cache[key] = (version, text)
+        return text
 
     async def format_day_schedule(self, day_of_week: int) -> str:
+        return await self._cached(("day", day_of_week), lambda: self._render_day(day_of_week))
+
+    async def format_week_schedule(self) -> str:
+        return await self._cached(("week", 0), self._render_week)
+
+    async def format_bells(self) -> str:
+        return await self._cached(("bells", 0), self._render_bells)
+
+    async def _render_day(self, day_of_week: int) -> str:
         items = await self.db.get_schedule_for_day(day_of_week)
+        return self._render_day_items(day_of_week, items)
+
+    @staticmethod
+    def _render_day_items(day_of_week: int, items: list[ScheduleItem]) -> str:
         day_name = DAYS_RU.get(day_of_week, f"День {day_of_week}")
 
         if not items:
@@ -17,50 +59,47 @@ class ScheduleService:
 
         lines = [f"{day_name}"]
         for item in items:
-            room = item.get("room") or "—"
-            room_text = "онлайн" if item.get("is_online") else f"каб. {room}"
-            start = item.get("start_time")
-            end = item.get("end_time")
+            room_text = "онлайн" if item.is_online else f"каб. {item.room or '—'}"
+            start, end = item.start_time, item.end_time
             time_text = f"{start}-{end}" if start and end else "время не задано"
-            teacher = item.get("teacher")
-            teacher_text = f" ({teacher})" if teacher else ""
+            teacher_text = f" ({item.teacher})" if item.teacher else ""
             lines.append(
-                f"{item['lesson_number']}) {item['subject']} - {time_text} - {room_text}{teacher_text}"
+                f"{item.lesson_number}) {item.subject} - {time_text} - {room_text}{teacher_text}"
             )
 
         return "\n".join(lines)
 
-    async def format_week_schedule(self) -> str:
+    async def _render_week(self) -> str:
+        version = self.db.schedule_version
+        by_day: dict[int, list[ScheduleItem]] = {day: [] for day in range(1, 8)}
+        for item in await self.db.get_schedule_for_week():
+            by_day.setdefault(item.day_of_week, []).append(item)
+
         parts: list[str] = []
         for day in range(1, 8):
-            parts.append(await self.format_day_schedule(day))
+            text = self._render_day_items(day, by_day[day])
+            # The week query already produced every day, so warm the day entries too
+            self._cache[("day", day)] = (version, text)
+            parts.append(text)
         return "\n\n".join(parts)
 
-    async def format_bells(self) -> str:
+    async def _render_bells(self) -> str:
         bells = await self.db.get_bell_times()
         if not bells:
             weekly = await self.db.get_schedule_for_week()
-            inferred: dict[int, tuple[str, str]] = {}
+            inferred: dict[int, BellTime] = {}
             for item in weekly:
-                start = item.get("start_time")
-                end = item.get("end_time")
-                lesson_number = item.get("lesson_number")
-                if lesson_number and start and end and lesson_number not in inferred:
-                    inferred[int(lesson_number)] = (str(start), str(end))
+                if item.start_time and item.end_time and item.lesson_number not in inferred:
+                    inferred[item.lesson_number] = BellTime(
+                        item.lesson_number, item.start_time, item.end_time
+                    )
 
             if inferred:
-                bells = [
-                    {
-                        "lesson_number": num,
-                        "start_time": times[0],
-                        "end_time": times[1],
-                    }
-                    for num, times in sorted(inferred.items())
-                ]
+                bells = [inferred[num] for num in sorted(inferred)]
             else:
                 return "Звонки пока не настроены."
 
         lines = ["Звонки:"]
         for bell in bells:
-            lines.append(f"{bell['lesson_number']}) {bell['start_time']}-{bell['end_time']}")
+            lines.append(f"{bell.lesson_number}) {bell.start_time}-{bell.end_time}")
         return "\n".join(lines)
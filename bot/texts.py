@@ -40,3 +40,10 @@ EMPTY_DAY_TEXT = "На этот день уроков нет ✅"
 ACCESS_DENIED = "⛔ Доступ запрещён"
 
 ADMIN_TEXT = "Админ-панель: выбери действие"
+
+BOUNCE_REASONS_RU = {
+    "blocked": "заблокировали бота",
+    "deactivated": "аккаунт удалён",
+    "chat_not_found": "чат не найден",
+}
+NO_BOUNCES_TEXT = "Все напоминания доставляются ✅"
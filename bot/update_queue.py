@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram.types import Update
+
+UPDATE_WORKERS = 4
+UPDATE_QUEUE_SIZE = 1000
+
+
+def chat_key(update: Update) -> int:
+    """Chat (or user) an update belongs to; updates with the same key are handled in order."""
+    try:
+        event = update.event
+    except LookupError:
+        return update.update_id
+    chat = getattr(event, "chat", None)
+    if chat is None:
+        message = getattr(event, "message", None)
+        chat = getattr(message, "chat", None)
+    if chat is not None:
+        return int(chat.id)
+    user = getattr(event, "from_user", None) or getattr(event, "user", None)
+    if user is not None:
+        return int(user.id)
+    return update.update_id
+
+
+class UpdateQueue:
+    """Bounded in-process queue that processes webhook updates in the background.
+
+    Each worker owns its own queue and updates are routed by chat, so updates of one
+    chat are processed strictly in arrival order while different chats run in parallel.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Update], Awaitable[Any]],
+        workers: int = UPDATE_WORKERS,
+        maxsize: int = UPDATE_QUEUE_SIZE,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.maxsize = max(self.workers, maxsize)
+        self._queues: list[asyncio.Queue[Update]] = []
+        self._tasks: list[asyncio.Task] = []
+        self.accepted = 0
+        self.rejected = 0
+        self.processed = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        per_worker = self.maxsize // self.workers
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._worker(queue), name=f"update-worker-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+
+    async def stop(self) -> None:
+        """Finish every queued update, then stop the workers."""
+        for queue in self._queues:
+            await queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+
+    def submit(self, update: Update) -> bool:
+        """Queue an update; False when its worker queue is full (or the queue is stopped)."""
+        if not self._queues:
+            return False
+        queue = self._queues[chat_key(update) % self.workers]
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def _worker(self, queue: asyncio.Queue[Update]) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                await self.handler(update)
+            except Exception:
+                logging.exception("Background update %s failed", update.update_id)
+            finally:
+                self.processed += 1
+                queue.task_done()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+
+# Column defaults of user_settings in models.sql
+DEFAULT_REMINDERS_ENABLED = False
+DEFAULT_REMINDER_MINUTES = 10
+
+
+class UserSettingsCache:
+    """Every user_settings row in parallel arrays sorted by user_id.
+
+    About 10 bytes per user instead of a dict per row, plus a sorted array of enabled
+    subscriber ids for each reminder_minutes value, so reminder fan-out needs no SQL.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, int, int]] = ()):
+        """rows are (user_id, reminders_enabled, reminder_minutes) ordered by user_id."""
+        self._ids = array("q")
+        self._enabled = bytearray()
+        self._minutes = array("B")
+        self._subscribers: dict[int, array] = {}
+        for user_id, enabled, minutes in rows:
+            self._ids.append(user_id)
+            self._enabled.append(1 if enabled else 0)
+            self._minutes.append(minutes)
+            if enabled:
+                self._subscribers.setdefault(minutes, array("q")).append(user_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _find(self, user_id: int) -> tuple[int, bool]:
+        index = bisect_left(self._ids, user_id)
+        return index, index < len(self._ids) and self._ids[index] == user_id
+
+    def get(self, user_id: int) -> tuple[bool, int] | None:
+        index, found = self._find(user_id)
+        if not found:
+            return None
+        return bool(self._enabled[index]), self._minutes[index]
+
+    def update(self, user_id: int, enabled: bool | None = None, minutes: int | None = None) -> None:
+        """Apply a committed upsert; missing users start from the column defaults."""
+        index, found = self._find(user_id)
+        if not found:
+            self._ids.insert(index, user_id)
+            self._enabled.insert(index, 1 if DEFAULT_REMINDERS_ENABLED else 0)
+            self._minutes.insert(index, DEFAULT_REMINDER_MINUTES)
+        elif self._enabled[index]:
+            self._unsubscribe(user_id, self._minutes[index])
+
+        if enabled is not None:
+            self._enabled[index] = 1 if enabled else 0
+        if minutes is not None:
+            self._minutes[index] = minutes
+        if self._enabled[index]:
+            self._subscribe(user_id, self._minutes[index])
+
+    def _subscribe(self, user_id: int, minutes: int) -> None:
+        subscribers = self._subscribers.setdefault(minutes, array("q"))
+        index = bisect_left(subscribers, user_id)
+        if index == len(subscribers) or subscribers[index] != user_id:
+            subscribers.insert(index, user_id)
+
+    def _unsubscribe(self, user_id: int, minutes: int) -> None:
+        subscribers = self._subscribers.get(minutes)
+        if subscribers is None:
+            return
+        index = bisect_left(subscribers, user_id)
+        if index < len(subscribers) and subscribers[index] == user_id:
+            del subscribers[index]
+        if not subscribers:
+            del self._subscribers[minutes]
+
+    def subscribers(self, minutes: int) -> array:
+        """Enabled subscriber ids with this reminder_minutes, sorted."""
+        return self._subscribers.get(minutes, array("q"))[:]
+
+    def subscribers_after(self, minutes: int, after_user_id: int, limit: int) -> array:
+        """Up to limit enabled subscriber ids with this reminder_minutes above after_user_id."""
+        subscribers = self._subscribers.get(minutes)
+        if subscribers is None:
+            return array("q")
+        start = bisect_right(subscribers, after_user_id)
+        return subscribers[start : start + limit]
+
+    def buckets(self) -> dict[int, int]:
+        """reminder_minutes -> number of enabled subscribers."""
+        return {minutes: len(ids) for minutes, ids in sorted(self._subscribers.items())}
+
+    def memory_bytes(self) -> int:
+        size = self._ids.itemsize * len(self._ids) + len(self._enabled) + len(self._minutes)
+        return size + sum(ids.itemsize * len(ids) for ids in self._subscribers.values())
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import json
 import re
 from datetime import datetime, timedelta
+from typing import Any
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 TIME_RE = re.compile(r"^(?:[01]\d|2[0-3]):[0-5]\d$")
 
 
@@ -34,3 +41,9 @@ def day_of_week_monday_first(dt: datetime) -> int:
 
 def tomorrow(dt: datetime) -> datetime:
     return dt + timedelta(days=1)
+
+
+def json_loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
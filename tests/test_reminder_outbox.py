@@ -0,0 +1,119 @@
+"""Cron reminder outbox against a fake clock and bot.
+
+Run: python3 -m unittest discover tests
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import Database  # noqa: E402
+from bot.services.reminder_service import ReminderService  # noqa: E402
+
+TIMEZONE = ZoneInfo("UTC")
+USER_ID = 1001
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent.append((chat_id, text))
+
+
+class ReminderOutboxTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # The coming Monday, so reminder_log cleanup keeps the rows the test writes
+        today = datetime.now(TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.now = self.monday
+        for target, clock in (
+            ("time.time", lambda: self.now.timestamp()),
+            ("bot.services.reminder_service.now_in_timezone", lambda tz: self.now.astimezone(tz)),
+        ):
+            patcher = mock.patch(target, clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = Database(Path(self.tmp.name) / "bot.db")
+        await self.db.init()
+        self.addAsyncCleanup(self.db.close)
+        await self.db.set_user_reminders_enabled(USER_ID, True)
+        self.bot = FakeBot()
+        self.service = ReminderService(self.bot, self.db, TIMEZONE)
+
+    async def add_lesson(self, start_time: str | None, room: str = "101") -> None:
+        await self.db.upsert_schedule_item(1, 1, "Алгебра", room, None, start_time, "23:00", False)
+
+    async def tick_at(self, hhmm_ss: str) -> list[str]:
+        hours, minutes, seconds = map(int, hhmm_ss.split(":"))
+        self.now = self.monday.replace(hour=hours, minute=minutes, second=seconds)
+        sent_before = len(self.bot.sent)
+        await self.service.tick()
+        return [text for _, text in self.bot.sent[sent_before:]]
+
+    async def edit_at(self, hhmm_ss: str, edit) -> None:
+        hours, minutes, seconds = map(int, hhmm_ss.split(":"))
+        self.now = self.monday.replace(hour=hours, minute=minutes, second=seconds)
+        await edit
+
+    async def test_due_reminder_is_sent_on_time(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        self.assertEqual(await self.tick_at("08:20:05"), ["Через 10 минут: Алгебра, каб. 101 ⏰"])
+        self.assertEqual(await self.tick_at("08:21:05"), [])
+
+    async def test_late_first_tick_still_sends(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:25:00"), ["Через 10 минут: Алгебра, каб. 101 ⏰"])
+
+    async def test_lesson_added_after_its_fire_time(self) -> None:
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        self.now = self.monday.replace(hour=8, minute=22)
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:22:30"), ["Через 10 минут: Алгебра, каб. 101 ⏰"])
+
+    async def test_started_lesson_is_not_reminded(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:31:00"), [])
+
+    async def test_lesson_deleted_inside_fire_window(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        await self.edit_at("08:19:40", self.db.delete_schedule_item(1, 1))
+        self.assertEqual(await self.tick_at("08:20:05"), [])
+
+    async def test_lesson_moved_inside_fire_window(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        await self.edit_at("08:19:40", self.add_lesson("09:30"))
+        self.assertEqual(await self.tick_at("08:20:05"), [])
+        self.assertEqual(await self.tick_at("09:20:05"), ["Через 10 минут: Алгебра, каб. 101 ⏰"])
+
+    async def test_room_changed_inside_fire_window(self) -> None:
+        await self.add_lesson("08:30")
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        await self.edit_at("08:19:40", self.add_lesson("08:30", room="205"))
+        self.assertEqual(await self.tick_at("08:20:05"), ["Через 10 минут: Алгебра, каб. 205 ⏰"])
+
+    async def test_bell_moved_inside_fire_window(self) -> None:
+        await self.db.upsert_bell_time(1, "08:30", "09:15")
+        await self.add_lesson(None)
+        self.assertEqual(await self.tick_at("08:00:00"), [])
+        await self.edit_at("08:19:40", self.db.upsert_bell_time(1, "09:30", "10:15"))
+        self.assertEqual(await self.tick_at("08:20:05"), [])
+        self.assertEqual(await self.tick_at("09:20:05"), ["Через 10 минут: Алгебра, каб. 101 ⏰"])
+
+
+if __name__ == "__main__":
+    unittest.main()